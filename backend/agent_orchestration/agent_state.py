@@ -128,7 +128,7 @@ class AgentState(DictionaryState):
         """
         async with self._lock:
             logger = logging.getLogger(__name__)
-            logger.info(f"Updating agent state with: {kwargs}")
+            logger.info("Updating agent state with: %s", kwargs)
             
             for key, value in kwargs.items():
                 if hasattr(self, key):
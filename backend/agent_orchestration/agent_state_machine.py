@@ -25,6 +25,7 @@ transition_machine = AgentTransitionMachine(llm, tools, extract_pref, extract_ti
 
 import json
 import logging
+import sys
 from typing import List, Dict, Any, Optional, Union, AsyncGenerator, Callable
 from datetime import datetime, timezone as dt_timezone
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage
@@ -79,6 +80,8 @@ class AgentStateMachine:
         """
         self.llm = llm
         self.tools = tools
+        # Interned tool names for O(1) membership checks on parsed LLM output
+        self.tool_names = frozenset(sys.intern(tool.name) for tool in tools)
         self.extract_preference_func = extract_preference_func
         self.extract_timeframe_func = extract_timeframe_func
         self.current_state = AgentState.THINKING  # Initialize with default state
@@ -326,12 +329,12 @@ ARGS: <tool_arguments>"""
                 tool_line = lines[0]
                 args_line = lines[1] if len(lines) > 1 else ""
                 
-                tool_name = tool_line[5:].strip()
+                tool_name = sys.intern(tool_line[5:].strip())
                 tool_args = args_line[5:].strip() if args_line.startswith("ARGS:") else ""
                 
                 # Validate tool exists
-                tool_names = [tool.name for tool in self.tools]
-                if tool_name not in tool_names:
+                if tool_name not in self.tool_names:
+                    tool_names = [tool.name for tool in self.tools]
                     return {"type": "message", "content": f"I don't have access to the '{tool_name}' tool. Available tools: {', '.join(tool_names)}"}
                 
                 return {
@@ -29,6 +29,18 @@ class ToolMetadata:
     return_type: Any = None
     is_async: bool = False
 
+def _collect_call_args(args: tuple, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine the positional and keyword arguments LangChain passes into one dict."""
+    if not args:
+        # Only kwargs provided
+        return kwargs
+    if isinstance(args[0], dict):
+        all_args = dict(args[0]) if kwargs else args[0]
+    else:
+        all_args = {"input": args[0]}
+    all_args.update(kwargs)
+    return all_args
+
 class ToolDiscoveryStrategy(ABC):
     """Abstract base class for tool discovery strategies."""
     
@@ -240,72 +252,30 @@ class AutoToolManager:
         for metadata in self.tool_metadata:
             service = self.services[metadata.service]
             method = getattr(service, metadata.method_name)
-            
-            # Create a universal wrapper that handles any parameter pattern
-            def create_universal_wrapper(service_method, method_metadata):
-                import logging
-                def sync_wrapper(*args, **kwargs):
-                    logger = logging.getLogger(__name__)
-                    # Handle different calling patterns from LangChain
-                    if args and kwargs:
-                        # Both args and kwargs provided - combine them
-                        all_args = {}
-                        if isinstance(args[0], dict):
-                            all_args.update(args[0])
-                        else:
-                            all_args["input"] = args[0]
-                        all_args.update(kwargs)
-                    elif args:
-                        # Only args provided
-                        if isinstance(args[0], dict):
-                            all_args = args[0]
-                        else:
-                            all_args = {"input": args[0]}
-                    else:
-                        # Only kwargs provided
-                        all_args = kwargs
-                    
-                    logger.debug(f"Calling {service_method.__name__} with args: {all_args}")
-                    return self._call_service_method(service_method, method_metadata, all_args)
-                
-                async def async_wrapper(*args, **kwargs):
-                    logger = logging.getLogger(__name__)
-                    # Handle different calling patterns from LangChain
-                    if args and kwargs:
-                        # Both args and kwargs provided - combine them
-                        all_args = {}
-                        if isinstance(args[0], dict):
-                            all_args.update(args[0])
-                        else:
-                            all_args["input"] = args[0]
-                        all_args.update(kwargs)
-                    elif args:
-                        # Only args provided
-                        if isinstance(args[0], dict):
-                            all_args = args[0]
-                        else:
-                            all_args = {"input": args[0]}
-                    else:
-                        # Only kwargs provided
-                        all_args = kwargs
-                    
-                    logger.debug(f"Calling {service_method.__name__} with args: {all_args}")
-                    return await self._call_service_method_async(service_method, method_metadata, all_args)
-                
-                if asyncio.iscoroutinefunction(service_method):
-                    return async_wrapper
-                else:
-                    return sync_wrapper
-            wrapped_method = create_universal_wrapper(method, metadata)
             tool = Tool(
                 name=metadata.name,
-                func=wrapped_method,
+                func=self._create_universal_wrapper(method, metadata),
                 description=metadata.description
             )
             tools.append(tool)
         self.tools = tools
         return tools
 
+    def _create_universal_wrapper(self, service_method: Callable, method_metadata: ToolMetadata) -> Callable:
+        """Create a wrapper that handles any parameter pattern from LangChain."""
+        if asyncio.iscoroutinefunction(service_method):
+            async def async_wrapper(*args, **kwargs):
+                all_args = _collect_call_args(args, kwargs)
+                logger.debug("Calling %s with args: %s", service_method.__name__, all_args)
+                return await self._call_service_method_async(service_method, method_metadata, all_args)
+            return async_wrapper
+        
+        def sync_wrapper(*args, **kwargs):
+            all_args = _collect_call_args(args, kwargs)
+            logger.debug("Calling %s with args: %s", service_method.__name__, all_args)
+            return self._call_service_method(service_method, method_metadata, all_args)
+        return sync_wrapper
+
     def _call_service_method(self, method: Callable, metadata: ToolMetadata, args: dict):
         """
         Universal method caller that adapts arguments to match the method signature.
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 import json
@@ -26,6 +27,8 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+VALID_ROLES = frozenset(("user", "assistant", "system"))
+
 # Global service instances
 calendar_service = None
 gmail_service = None
@@ -42,35 +45,42 @@ async def initialize_services():
     try:
         logger.info("Initializing Google services...")
         
-        # Initialize calendar service
+        # Initialize calendar service first; it may run the interactive OAuth
+        # flow and writes the token file the remaining services share
         calendar_service = GoogleCalendarService()
         await calendar_service.authenticate()
         
-        # Initialize gmail service
-        gmail_service = GoogleGmailService()
-        await gmail_service.authenticate()
-        
         # Get the Google Maps API key from environment variables
         maps_api_key = os.getenv("GOOGLE_MAPS_API_KEY")
         if not maps_api_key:
             raise ValueError("Missing required environment variable: GOOGLE_MAPS_API_KEY")
         maps_service = GoogleMapsService(api_key=maps_api_key)
         
-        # Initialize fitness service
+        # The remaining services only load the cached token and build their
+        # API clients, so authenticate them concurrently
+        gmail_service = GoogleGmailService()
         fitness_service = GoogleFitnessService()
-        await fitness_service.authenticate()
-        
-        # Initialize tasks service
         tasks_service = GoogleTasksService()
-        await tasks_service.authenticate()
-        
-        # Initialize drive service
         drive_service = GoogleDriveService()
-        await drive_service.authenticate()
-        
-        # Initialize sheets service
         sheets_service = GoogleSheetsService()
-        await sheets_service.authenticate()
+        pending = {
+            'gmail': gmail_service,
+            'fitness': fitness_service,
+            'tasks': tasks_service,
+            'drive': drive_service,
+            'sheets': sheets_service,
+        }
+        results = await asyncio.gather(
+            *(service.authenticate() for service in pending.values()),
+            return_exceptions=True
+        )
+        errors = [
+            f"{name}: {result}"
+            for name, result in zip(pending, results)
+            if isinstance(result, Exception)
+        ]
+        if errors:
+            raise RuntimeError("; ".join(errors))
         
         logger.info("All Google services initialized successfully")
         
@@ -109,6 +119,34 @@ class Message(BaseModel):
 class ChatRequest(BaseModel):
     messages: List[Message]
 
+def _normalize_messages(messages: List[Message]) -> List[Dict[str, str]]:
+    """Validate roles and content and strip whitespace, without re-serializing each message.
+
+    Pydantic has already guaranteed every message has string role and content fields.
+    """
+    normalized_messages = []
+    for i, msg in enumerate(messages):
+        role = msg.role
+        content = msg.content.strip()
+        
+        if role not in VALID_ROLES:
+            logger.error(f"Message {i} has invalid role: {role}")
+            raise HTTPException(status_code=400, detail=f"Message {i} has invalid role: {role}. Must be 'user', 'assistant', or 'system'")
+        
+        if not content:
+            logger.error(f"Message {i} has empty content")
+            raise HTTPException(status_code=400, detail=f"Message {i} has empty content")
+        
+        normalized_messages.append({"role": role, "content": content})
+    
+    logger.debug("Normalized messages to be processed: %s", normalized_messages)
+    return normalized_messages
+
+@router.get("/live")
+async def liveness_check():
+    """Liveness endpoint; answers as soon as the server accepts requests, with no service checks."""
+    return {"status": "alive"}
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint."""
@@ -126,37 +164,7 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks, x_api_ke
         logger.error("No messages provided in request")
         raise HTTPException(status_code=400, detail="No messages provided")
     
-    # Convert Pydantic Message objects to dicts and validate
-    raw_messages = [msg.dict() if hasattr(msg, 'dict') else msg for msg in request.messages]
-    logger.debug(f"Raw incoming messages: {raw_messages}")
-    
-    # Normalize and validate messages
-    normalized_messages = []
-    for i, msg in enumerate(raw_messages):
-        if not isinstance(msg, dict):
-            logger.error(f"Message {i} is not a dict: {msg}")
-            raise HTTPException(status_code=400, detail=f"Message {i} is not a valid message object")
-        
-        if 'role' not in msg or 'content' not in msg:
-            logger.error(f"Message {i} missing required fields: {msg}")
-            raise HTTPException(status_code=400, detail=f"Message {i} missing required fields: role and content")
-        
-        role = msg['role']
-        content = msg['content']
-        
-        if role not in {"user", "assistant", "system"}:
-            logger.error(f"Message {i} has invalid role: {role}")
-            raise HTTPException(status_code=400, detail=f"Message {i} has invalid role: {role}. Must be 'user', 'assistant', or 'system'")
-        
-        if not content or not content.strip():
-            logger.error(f"Message {i} has empty content")
-            raise HTTPException(status_code=400, detail=f"Message {i} has empty content")
-        
-        normalized = {"role": role, "content": content.strip()}
-        logger.debug(f"Successfully normalized message {i}: {msg} -> {normalized}")
-        normalized_messages.append(normalized)
-    
-    logger.debug(f"Normalized messages to be processed: {normalized_messages}")
+    normalized_messages = _normalize_messages(request.messages)
 
     if not normalized_messages:
         logger.error("No valid messages after normalization")
@@ -170,10 +178,11 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks, x_api_ke
             responses.append(response)
         logger.info("Successfully processed messages")
         combined_response = "\n".join(responses) if responses else "No response generated."
-        return {
+        # The payload is plain strings, so skip FastAPI's recursive jsonable_encoder pass
+        return JSONResponse({
             "response": combined_response,
             "type": "single"
-        }
+        })
     except Exception as e:
         logger.error(f"Error in /chat endpoint: {str(e)}", exc_info=True)
         logger.error(f"Traceback: {traceback.format_exc()}")
@@ -249,7 +258,7 @@ async def shutdown(request: Request):
     logger.info("Shutdown endpoint called")
     try:
         # Write a shutdown signal file
-        with open("shutdown.signal", "w") as f:
+        with open(os.environ.get("SHUTDOWN_SIGNAL_FILE", "shutdown.signal"), "w") as f:
             f.write("shutdown")
         logger.info("Shutdown signal file created")
         return JSONResponse({"message": "Shutting down servers..."})
@@ -266,37 +275,7 @@ async def chat_stream(request: ChatRequest, background_tasks: BackgroundTasks, x
         logger.error("No messages provided in request")
         raise HTTPException(status_code=400, detail="No messages provided")
     
-    # Convert Pydantic Message objects to dicts and validate
-    raw_messages = [msg.dict() if hasattr(msg, 'dict') else msg for msg in request.messages]
-    logger.debug(f"Raw incoming messages: {raw_messages}")
-    
-    # Normalize and validate messages
-    normalized_messages = []
-    for i, msg in enumerate(raw_messages):
-        if not isinstance(msg, dict):
-            logger.error(f"Message {i} is not a dict: {msg}")
-            raise HTTPException(status_code=400, detail=f"Message {i} is not a valid message object")
-        
-        if 'role' not in msg or 'content' not in msg:
-            logger.error(f"Message {i} missing required fields: {msg}")
-            raise HTTPException(status_code=400, detail=f"Message {i} missing required fields: role and content")
-        
-        role = msg['role']
-        content = msg['content']
-        
-        if role not in {"user", "assistant", "system"}:
-            logger.error(f"Message {i} has invalid role: {role}")
-            raise HTTPException(status_code=400, detail=f"Message {i} has invalid role: {role}. Must be 'user', 'assistant', or 'system'")
-        
-        if not content or not content.strip():
-            logger.error(f"Message {i} has empty content")
-            raise HTTPException(status_code=400, detail=f"Message {i} has empty content")
-        
-        normalized = {"role": role, "content": content.strip()}
-        logger.debug(f"Successfully normalized message {i}: {msg} -> {normalized}")
-        normalized_messages.append(normalized)
-    
-    logger.debug(f"Normalized messages to be processed: {normalized_messages}")
+    normalized_messages = _normalize_messages(request.messages)
 
     if not normalized_messages:
         logger.error("No valid messages after normalization")
@@ -322,7 +301,8 @@ async def chat_stream(request: ChatRequest, background_tasks: BackgroundTasks, x
 @router.get("/knowledge-graph")
 def get_knowledge_graph():
     kg = KnowledgeGraph()  # Loads from file if exists
-    logging.getLogger(__name__).info(f"/knowledge-graph API called. Entities: {list(kg.entity_map.keys())}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("/knowledge-graph API called. Entities: %s", list(kg.entity_map))
     return kg.to_dict()
 
 @router.get("/state-history")
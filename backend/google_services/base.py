@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 from abc import ABC, abstractmethod
@@ -30,7 +31,9 @@ class GoogleServiceBase(ABC):
         """Authenticate with Google API."""
         try:
             logger.info("Authenticating with Google API...")
-            self.creds = get_google_credentials()
+            # Load credentials off the event loop so several services can
+            # authenticate concurrently
+            self.creds = await asyncio.to_thread(get_google_credentials)
             logger.debug("Credentials obtained successfully")
             self.service = await self.initialize_service()
             logger.info("Service initialized successfully")
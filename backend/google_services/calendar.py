@@ -35,7 +35,7 @@ class GoogleCalendarService(GoogleServiceBase):
         """Initialize the Google Calendar service using the new OAuth flow."""
         # Don't call authenticate() here - it's handled by the base class
         # Just build and return the service
-        return build('calendar', 'v3', credentials=self.creds)
+        return await asyncio.to_thread(build, 'calendar', 'v3', credentials=self.creds)
 
     async def get_upcoming_events(self, args: Union[str, Dict[str, Any]] = None, max_results: int = 10) -> List[Dict[str, Any]]:
         """Asynchronously get upcoming events from the user's calendar."""
@@ -235,7 +235,7 @@ class GoogleCalendarService(GoogleServiceBase):
             Dict[str, Any]: Created event details
         """
         try:
-            logger.info(f"Creating calendar event with details: {event_details}")
+            logger.info("Creating calendar event with details: %s", event_details)
             required_fields = ['summary', 'start', 'end']
             missing_fields = [field for field in required_fields if field not in event_details]
             if missing_fields:
@@ -533,22 +533,23 @@ class GoogleCalendarService(GoogleServiceBase):
             conflicting_events = []
             resolution_action = 'skip'
         
-        if resolution_action == 'replace':
-            # Delete all conflicting events
-            for event in conflicting_events:
-                event_id = event.get('id')
-                if event_id:
-                    await self.delete_event(event_id)
-            # Create the proposed event
-            return await self.write_event(proposed_event)
-        elif resolution_action == 'skip':
-            return {'skipped': True, 'message': 'Event creation skipped due to conflict.'}
-        elif resolution_action == 'delete':
-            # Delete the first conflicting event only
-            if conflicting_events:
-                event_id = conflicting_events[0].get('id')
-                if event_id:
-                    await self.delete_event(event_id)
-            return await self.write_event(proposed_event)
-        else:
-            return {'error': 'Unknown resolution action.'}
+        match resolution_action:
+            case 'replace':
+                # Delete all conflicting events
+                for event in conflicting_events:
+                    event_id = event.get('id')
+                    if event_id:
+                        await self.delete_event(event_id)
+                # Create the proposed event
+                return await self.write_event(proposed_event)
+            case 'skip':
+                return {'skipped': True, 'message': 'Event creation skipped due to conflict.'}
+            case 'delete':
+                # Delete the first conflicting event only
+                if conflicting_events:
+                    event_id = conflicting_events[0].get('id')
+                    if event_id:
+                        await self.delete_event(event_id)
+                return await self.write_event(proposed_event)
+            case _:
+                return {'error': 'Unknown resolution action.'}
@@ -22,7 +22,7 @@ class GoogleDriveService(GoogleServiceBase):
         
     async def initialize_service(self):
         """Initialize the Google Drive service using the new OAuth flow."""
-        return build('drive', 'v3', credentials=self.creds)
+        return await asyncio.to_thread(build, 'drive', 'v3', credentials=self.creds)
         
     def list_files(self, query: str = '', max_results: int = 10) -> List[Dict]:
         """
@@ -26,7 +26,7 @@ class GoogleFitnessService(GoogleServiceBase):
     async def initialize_service(self):
         """Initialize the Google Fitness service."""
         # Don't call authenticate() here - it's handled by the base class
-        return build('fitness', 'v1', credentials=self.creds)
+        return await asyncio.to_thread(build, 'fitness', 'v1', credentials=self.creds)
 
     async def get_activities(self, days: int = 7) -> List[Dict[str, Any]]:
         """Asynchronously get recent fitness activities."""
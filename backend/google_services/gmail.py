@@ -26,7 +26,7 @@ class GoogleGmailService(GoogleServiceBase):
 
     async def initialize_service(self):
         """Initialize the Google Gmail service using the new OAuth flow."""
-        return build('gmail', 'v1', credentials=self.creds)
+        return await asyncio.to_thread(build, 'gmail', 'v1', credentials=self.creds)
 
     async def get_recent_emails(self, max_results: int = 10) -> List[Dict[str, Any]]:
         """Asynchronously get recent emails from the user's Gmail."""
@@ -15,6 +15,39 @@ import asyncio
 
 logger = logging.getLogger(__name__)
 
+# Fallbacks for fields the Places API omits
+DEFAULT_PLACE_NAME = 'Unknown'
+DEFAULT_PLACE_ADDRESS = 'No address'
+DEFAULT_PLACE_RATING = 'No rating'
+
+def _summarize_place(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a Places API result to the fields the agent uses."""
+    return {
+        'name': result.get('name', DEFAULT_PLACE_NAME),
+        'address': result.get('vicinity', DEFAULT_PLACE_ADDRESS),
+        'rating': result.get('rating', DEFAULT_PLACE_RATING),
+        'place_id': result.get('place_id', ''),
+        'location': result.get('geometry', {}).get('location', {})
+    }
+
+def _format_route(index: int, leg: Dict[str, Any]):
+    """Yield the display lines for one route's first leg."""
+    yield f"Route {index}:"
+    yield f"Distance: {leg['distance']['text']}"
+    yield f"Duration: {leg['duration']['text']}"
+    yield "Steps:"
+    for step in leg['steps']:
+        yield f"- {step['html_instructions']}"
+    yield ""
+
+def _format_place(index: int, place: Dict[str, Any]):
+    """Yield the display lines for one Places API result."""
+    yield f"{index}. {place['name']}"
+    yield f"   Address: {place.get('vicinity', 'No address available')}"
+    yield f"   Rating: {place.get('rating', DEFAULT_PLACE_RATING)}"
+    yield f"   Types: {', '.join(place.get('types', []))}"
+    yield ""
+
 class GoogleMapsService(GoogleAPIService):
     """Service for interacting with Google Maps API."""
     
@@ -39,30 +72,11 @@ class GoogleMapsService(GoogleAPIService):
             if not result:
                 return "No directions found."
             
-            # Format the directions
-            directions = []
-            for route in result:
-                steps = []
-                for step in route['legs'][0]['steps']:
-                    steps.append(step['html_instructions'])
-                directions.append({
-                    'distance': route['legs'][0]['distance']['text'],
-                    'duration': route['legs'][0]['duration']['text'],
-                    'steps': steps
-                })
-            
-            # Format the response
-            response = []
-            for i, route in enumerate(directions, 1):
-                response.append(f"Route {i}:")
-                response.append(f"Distance: {route['distance']}")
-                response.append(f"Duration: {route['duration']}")
-                response.append("Steps:")
-                for step in route['steps']:
-                    response.append(f"- {step}")
-                response.append("")
-            
-            return "\n".join(response)
+            return "\n".join(
+                line
+                for i, route in enumerate(result, 1)
+                for line in _format_route(i, route['legs'][0])
+            )
             
         except Exception as e:
             logger.error(f"Error getting directions: {str(e)}")
@@ -81,26 +95,11 @@ class GoogleMapsService(GoogleAPIService):
             if not result or 'results' not in result:
                 return "No places found."
             
-            # Format the results
-            places = []
-            for place in result['results']:
-                places.append({
-                    'name': place['name'],
-                    'address': place.get('vicinity', 'No address available'),
-                    'rating': place.get('rating', 'No rating'),
-                    'types': place.get('types', [])
-                })
-            
-            # Format the response
-            response = []
-            for i, place in enumerate(places, 1):
-                response.append(f"{i}. {place['name']}")
-                response.append(f"   Address: {place['address']}")
-                response.append(f"   Rating: {place['rating']}")
-                response.append(f"   Types: {', '.join(place['types'])}")
-                response.append("")
-            
-            return "\n".join(response)
+            return "\n".join(
+                line
+                for i, place in enumerate(result['results'], 1)
+                for line in _format_place(i, place)
+            )
             
         except Exception as e:
             logger.error(f"Error finding nearby places: {str(e)}")
@@ -194,16 +193,7 @@ class GoogleMapsService(GoogleAPIService):
                 response = requests.get(url, params=params)
                 response.raise_for_status()
                 results = response.json()
-                trails = []
-                for result in results.get('results', []):
-                    trails.append({
-                        'name': result.get('name', 'Unknown'),
-                        'address': result.get('vicinity', 'No address'),
-                        'rating': result.get('rating', 'No rating'),
-                        'place_id': result.get('place_id', ''),
-                        'location': result.get('geometry', {}).get('location', {})
-                    })
-                return trails
+                return [_summarize_place(result) for result in results.get('results', [])]
             return await asyncio.to_thread(search)
         except Exception as e:
             logger.error(f"Error finding running trails: {e}")
@@ -247,16 +237,7 @@ class GoogleMapsService(GoogleAPIService):
                 response = requests.get(url, params=params, timeout=10)
                 response.raise_for_status()
                 results = response.json().get('results', [])
-                places = []
-                for result in results:
-                    places.append({
-                        'name': result.get('name', 'Unknown'),
-                        'address': result.get('vicinity', 'No address'),
-                        'rating': result.get('rating', 'No rating'),
-                        'place_id': result.get('place_id', ''),
-                        'location': result.get('geometry', {}).get('location', {})
-                    })
-                return places
+                return [_summarize_place(result) for result in results]
             return await asyncio.to_thread(search)
         except Exception as e:
             logger.error(f"Error finding places nearby: {e}")
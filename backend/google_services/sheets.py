@@ -23,7 +23,7 @@ class GoogleSheetsService(GoogleServiceBase):
 
     async def initialize_service(self):
         """Initialize the Google Sheets service using the new OAuth flow."""
-        return build('sheets', 'v4', credentials=self.creds)
+        return await asyncio.to_thread(build, 'sheets', 'v4', credentials=self.creds)
 
     def create_spreadsheet(self, title: str) -> Dict:
         """
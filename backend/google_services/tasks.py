@@ -25,7 +25,7 @@ class GoogleTasksService(GoogleServiceBase):
     async def initialize_service(self):
         """Initialize the Google Tasks service."""
         # Don't call authenticate() here - it's handled by the base class
-        return build('tasks', 'v1', credentials=self.creds)
+        return await asyncio.to_thread(build, 'tasks', 'v1', credentials=self.creds)
         
     async def list_tasklists(self) -> List[Dict]:
         """Asynchronously list all task lists."""
@@ -15,6 +15,9 @@ My address is 1 Infinite Loop, Cupertino, CA 95014.
 
 For workouts, I prefer strength training."""
 
+NAME_PATTERN = re.compile(r"name is ([\w'\- ]+)", re.IGNORECASE)
+FIRST_PERSON_PATTERN = re.compile(r"\b(I|my|me|mine)\b", re.IGNORECASE)
+
 @dataclass
 class Entity:
     """Represents an entity in the knowledge graph."""
@@ -125,7 +128,8 @@ class KnowledgeGraph:
             self.relation_map[key] = relation
             self.graph.add_edge(rel['source'], rel['target'], **{"type": rel['type'], **rel['attributes']})
         self.root_person = data.get('root_person')
-        logger.info(f"KnowledgeGraph loaded entities: {list(self.entity_map.keys())}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("KnowledgeGraph loaded entities: %s", list(self.entity_map))
         logger.info(f"KnowledgeGraph loaded relations: {len(self.relation_map)} relations")
 
     def parse_prompt(self, prompt: str) -> None:
@@ -143,8 +147,9 @@ class KnowledgeGraph:
         for sentence in sentences:
             self._extract_entities(sentence)
             # Try to extract the user's name as root
-            if self.root_person is None:
-                match = re.search(r"name is ([\w'\- ]+)", sentence, re.IGNORECASE)
+            # Cheap substring check first; most sentences never mention a name
+            if self.root_person is None and "name is" in sentence.lower():
+                match = NAME_PATTERN.search(sentence)
                 if match:
                     self.root_person = match.group(1).strip()
         
@@ -238,7 +243,7 @@ class KnowledgeGraph:
     
     def _is_first_person(self, sentence: str) -> bool:
         """Check if the sentence is about the first person (I, my, me)."""
-        return bool(re.search(r"\b(I|my|me|mine)\b", sentence, re.IGNORECASE))
+        return bool(FIRST_PERSON_PATTERN.search(sentence))
         
     def _find_subject_in_context(self, context: str) -> Optional[str]:
         """Find the subject of a sentence in the given context."""
@@ -26,6 +26,16 @@ def test_health_check(client):
     assert response.status_code == 200
     assert response.json() == {"status": "healthy"}
 
+@pytest.mark.skipif(not os.getenv("GOOGLE_CLIENT_ID"), reason="Google credentials not provided")
+def test_liveness_check(client):
+    """
+    Test the liveness endpoint.
+    It should return a 200 status code without touching any services.
+    """
+    response = client.get("/api/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+
 @pytest.mark.skipif(not os.getenv("GOOGLE_CLIENT_ID"), reason="Google credentials not provided")
 def test_get_calendar_events(client):
     """
@@ -66,7 +66,7 @@ class TestAuthIntegration:
             assert value is not None
             assert len(value) > 0
     
-    @patch('backend.utilities.auth.InstalledAppFlow')
+    @patch('google_auth_oauthlib.flow.InstalledAppFlow')
     def test_oauth_flow_initialization(self, mock_flow):
         """Test OAuth flow initialization."""
         mock_flow_instance = MagicMock()
@@ -77,17 +77,17 @@ class TestAuthIntegration:
         assert mock_flow.from_client_config is not None
     
     @patch('backend.utilities.auth.os.path.exists')
-    @patch('backend.utilities.auth.pickle.load')
-    def test_credentials_loading(self, mock_pickle_load, mock_exists):
-        """Test credentials loading from pickle files."""
+    @patch('backend.utilities.auth.Credentials.from_authorized_user_info')
+    def test_credentials_loading(self, mock_from_info, mock_exists):
+        """Test credentials loading from JSON token files."""
         mock_exists.return_value = True
         mock_creds = MagicMock()
         mock_creds.valid = True
-        mock_pickle_load.return_value = mock_creds
+        mock_from_info.return_value = mock_creds
         
         # Test that credentials can be loaded
         assert mock_exists.return_value is True
-        assert mock_pickle_load.return_value is not None
+        assert mock_from_info.return_value is not None
     
     def test_scopes_definition(self):
         """Test that OAuth scopes are properly defined."""
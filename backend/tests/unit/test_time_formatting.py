@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+from backend.utilities.time_formatting import extract_timeframe_from_text
+
+def _bounds(result):
+    return datetime.fromisoformat(result['timeMin']), datetime.fromisoformat(result['timeMax'])
+
+def test_no_timeframe_returns_none():
+    """Text without a known time frame yields None."""
+    assert extract_timeframe_from_text("Schedule a workout at the gym") is None
+
+def test_today_is_case_insensitive():
+    """'today' matches regardless of case and spans a single day."""
+    result = extract_timeframe_from_text("What do I have TODAY?")
+    start, end = _bounds(result)
+    assert (start.hour, start.minute, start.second) == (0, 0, 0)
+    assert end - start == timedelta(days=1, microseconds=-1)
+
+def test_tomorrow_starts_after_today():
+    """'tomorrow' starts exactly one day after 'today'."""
+    today_start, _ = _bounds(extract_timeframe_from_text("today"))
+    tomorrow_start, _ = _bounds(extract_timeframe_from_text("tomorrow"))
+    assert tomorrow_start - today_start == timedelta(days=1)
+
+def test_weeks_start_on_monday():
+    """Week ranges run Monday 00:00 to Sunday 23:59:59."""
+    this_start, this_end = _bounds(extract_timeframe_from_text("this week"))
+    next_start, _ = _bounds(extract_timeframe_from_text("next week"))
+    assert this_start.weekday() == 0
+    assert this_end - this_start == timedelta(days=6, hours=23, minutes=59, seconds=59)
+    assert next_start - this_start == timedelta(days=7)
+
+def test_week_takes_priority_over_day():
+    """When several time frames are mentioned, week phrases win over day phrases."""
+    assert extract_timeframe_from_text("tomorrow or later this week") == extract_timeframe_from_text("this week")
+    assert extract_timeframe_from_text("tomorrow or today") == extract_timeframe_from_text("today")
+
+def test_results_are_independent_copies():
+    """Mutating a returned range does not leak into later calls."""
+    first = extract_timeframe_from_text("today")
+    first['timeMin'] = 'changed'
+    assert extract_timeframe_from_text("today")['timeMin'] != 'changed'
@@ -9,6 +9,7 @@ import json
 import logging
 import os
 import asyncio
+import functools
 import pytz
 import dateparser
 import inspect
@@ -48,6 +49,18 @@ with open(CONFIG_PATH, 'r') as f:
 TOOL_MANAGER_CONFIG = config['llm']['tool_manager']
 DEFAULTS_CONFIG = config['defaults']
 
+DEFAULT_EVENT_TITLE = 'Untitled Event'
+
+@functools.lru_cache(maxsize=None)
+def _build_custom_tool(tool_name: str) -> Tool:
+    """Build a custom tool once per process; custom tools are not bound to services."""
+    tool_info = CUSTOM_TOOLS[tool_name]
+    return Tool(
+        name=tool_name,
+        func=tool_info['func'],
+        description=tool_info['description']
+    )
+
 class PersonalTrainerToolManager:
     """
     Personal Trainer Tool Manager using Auto-Discovery.
@@ -135,13 +148,8 @@ class PersonalTrainerToolManager:
         """Register custom tools that don't belong to a specific service."""
         logger.debug("Registering custom tools...")
         
-        for tool_name, tool_info in CUSTOM_TOOLS.items():
-            tool = Tool(
-                name=tool_name,
-                func=tool_info['func'],
-                description=tool_info['description']
-            )
-            self.tools.append(tool)
+        for tool_name in CUSTOM_TOOLS:
+            self.tools.append(_build_custom_tool(tool_name))
             logger.debug(f"Registered custom tool: {tool_name}")
 
     def _register_special_tools(self) -> None:
@@ -236,12 +244,12 @@ class PersonalTrainerToolManager:
         
         try:
             # Log the tool execution for debugging
-            logger.debug(f"Executing tool '{tool_name}' with args: {args}")
+            logger.debug("Executing tool '%s' with args: %s", tool_name, args)
             
             # Handle string arguments by parsing them into the appropriate format
             if isinstance(args, str):
                 parsed_args = await self._parse_and_convert_args(tool_name, args)
-                logger.debug(f"Parsed args for '{tool_name}': {parsed_args}")
+                logger.debug("Parsed args for '%s': %s", tool_name, parsed_args)
             else:
                 parsed_args = args
             
@@ -422,7 +430,9 @@ class PersonalTrainerToolManager:
                 else:
                     return "I've cleared your calendar for the specified time period."
             
-            prompt = get_tool_result_summary_prompt(tool_name, json.dumps(tool_result, default=str))
+            # Serialize once; the same string is reused to detect raw echoes below
+            serialized_result = json.dumps(tool_result, default=str)
+            prompt = get_tool_result_summary_prompt(tool_name, serialized_result)
             messages = [
                 SystemMessage(content="You are a helpful personal trainer AI assistant. Always respond in clear, natural language, never as a code block or raw data. Be encouraging and focused on helping the user achieve their fitness goals."),
                 HumanMessage(content=prompt)
@@ -442,7 +452,7 @@ class PersonalTrainerToolManager:
                 raise RuntimeError("LLM returned empty response")
             
             summary = response.content.strip()
-            if json.dumps(tool_result, default=str) in summary:
+            if serialized_result in summary:
                 raise RuntimeError("LLM returned raw tool result instead of a summary")
             if tool_name == "get_calendar_events":
                 event_titles = [event.get('summary', '') for event in tool_result if isinstance(event, dict)]
@@ -452,7 +462,7 @@ class PersonalTrainerToolManager:
                     events = []
                     for event in tool_result:
                         start = event.get('start', {}).get('dateTime', event.get('start', {}).get('date', ''))
-                        summary_title = event.get('summary', 'Untitled Event')
+                        summary_title = event.get('summary', DEFAULT_EVENT_TITLE)
                         events.append(f"- {summary_title} at {start}")
                     return "Here are your upcoming events in the requested time frame:\n" + "\n".join(events)
             return summary
@@ -471,7 +481,7 @@ class PersonalTrainerToolManager:
             elif result.get('skipped'):
                 return result.get('message', 'Event creation skipped due to conflict.')
             elif result.get('id'):  # Successfully created event
-                return f"Conflict resolved successfully. Event created: {result.get('summary', 'Untitled Event')}"
+                return f"Conflict resolved successfully. Event created: {result.get('summary', DEFAULT_EVENT_TITLE)}"
             else:
                 return f"Conflict resolution completed: {result.get('message', 'Unknown result')}"
         
@@ -480,21 +490,20 @@ class PersonalTrainerToolManager:
 
     def _get_fallback_summary(self, tool_name: str, tool_result: Any) -> str:
         """Generate a fallback summary when LLM summarization fails."""
-        if tool_name == "get_calendar_events":
-            if not tool_result or len(tool_result) == 0:
-                return "You have no upcoming events in the requested time frame."
-            else:
+        match tool_name:
+            case "get_calendar_events":
+                if not tool_result or len(tool_result) == 0:
+                    return "You have no upcoming events in the requested time frame."
                 return f"Found {len(tool_result)} upcoming events."
-        elif tool_name == "create_calendar_event":
-            return "Calendar event created successfully."
-        elif tool_name == "send_email":
-            return "Email sent successfully."
-        elif tool_name == "create_task":
-            return "Task created successfully."
-        elif tool_name == "get_tasks":
-            if not tool_result or len(tool_result) == 0:
-                return "You have no pending tasks."
-            else:
+            case "create_calendar_event":
+                return "Calendar event created successfully."
+            case "send_email":
+                return "Email sent successfully."
+            case "create_task":
+                return "Task created successfully."
+            case "get_tasks":
+                if not tool_result or len(tool_result) == 0:
+                    return "You have no pending tasks."
                 return f"Found {len(tool_result)} pending tasks."
-        else:
-            return f"Successfully executed {tool_name}." 
\ No newline at end of file
+            case _:
+                return f"Successfully executed {tool_name}." 
\ No newline at end of file
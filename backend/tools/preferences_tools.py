@@ -2,6 +2,16 @@ from backend.knowledge_graph import KnowledgeGraph, KNOWLEDGE_GRAPH_PROMPT
 import json
 import logging
 
+_PREFERENCE_KEYS = ('preference', 'preference_value', 'value')
+
+def _extract_preference_value(pref_dict: dict):
+    """Return the preference value from a dict payload."""
+    for key in _PREFERENCE_KEYS:
+        if key in pref_dict:
+            return pref_dict[key]
+    # Use the first value in the dict
+    return next(iter(pref_dict.values()))
+
 def add_preference_to_kg(preference, user_name: str = None):
     """Add a preference to the knowledge graph.
     
@@ -15,34 +25,18 @@ def add_preference_to_kg(preference, user_name: str = None):
     if user_name is None:
         user_name = kg.root_person
         
-    # Handle different input types
+    # Decode JSON strings once so dicts and JSON payloads share one path
+    if isinstance(preference, str) and preference.strip().startswith('{'):
+        try:
+            pref_dict = json.loads(preference)
+        except json.JSONDecodeError:
+            pref_dict = None
+        if isinstance(pref_dict, dict):
+            preference = pref_dict
+    
     if isinstance(preference, dict):
         # Extract the actual preference value from dict
-        if 'preference' in preference:
-            preference = preference['preference']
-        elif 'preference_value' in preference:
-            preference = preference['preference_value']
-        elif 'value' in preference:
-            preference = preference['value']
-        else:
-            # Use the first value in the dict
-            preference = next(iter(preference.values()))
-    elif isinstance(preference, str):
-        # Try to parse as JSON if it looks like JSON
-        if preference.strip().startswith('{'):
-            try:
-                pref_dict = json.loads(preference)
-                if isinstance(pref_dict, dict):
-                    if 'preference' in pref_dict:
-                        preference = pref_dict['preference']
-                    elif 'preference_value' in pref_dict:
-                        preference = pref_dict['preference_value']
-                    elif 'value' in pref_dict:
-                        preference = pref_dict['value']
-                    else:
-                        preference = next(iter(pref_dict.values()))
-            except json.JSONDecodeError:
-                pass
+        preference = _extract_preference_value(preference)
     
     # Clean up the preference string
     if isinstance(preference, str):
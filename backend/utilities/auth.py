@@ -1,12 +1,10 @@
+import functools
+import json
 import os
-from google_auth_oauthlib.flow import InstalledAppFlow
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
-import pickle
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
 
 # Define the scopes for each service
 SCOPES = {
@@ -22,21 +20,51 @@ SCOPES = {
     'sheets': ['https://www.googleapis.com/auth/spreadsheets']
 }
 
+# Only one interactive browser prompt may run at a time
+_flow_lock = threading.Lock()
+
+def _load_legacy_token(service_name: str):
+    """Load a token saved by older versions as a pickle, removing the file."""
+    legacy_file = f'{service_name}_token.pickle'
+    if not os.path.exists(legacy_file):
+        return None
+    import pickle
+    with open(legacy_file, 'rb') as token:
+        creds = pickle.load(token)
+    # Persist as JSON so the pickle is never read again
+    with open(f'{service_name}_token.json', 'w') as token:
+        token.write(creds.to_json())
+    os.remove(legacy_file)
+    return creds
+
+@functools.lru_cache(maxsize=None)
 def get_credentials(service_name: str) -> Credentials:
-    """Get credentials for a specific service."""
+    """Get credentials for a specific service.
+
+    Results are cached per service for the lifetime of the process; call
+    ``get_credentials.cache_clear()`` to pick up a re-authentication.
+    """
     creds = None
-    token_file = f'{service_name}_token.pickle'
+    token_file = f'{service_name}_token.json'
 
     # Load existing token if available
     if os.path.exists(token_file):
-        with open(token_file, 'rb') as token:
-            creds = pickle.load(token)
+        with open(token_file, 'r') as token:
+            creds = Credentials.from_authorized_user_info(json.load(token), SCOPES[service_name])
+    else:
+        creds = _load_legacy_token(service_name)
 
     # If no valid credentials available, let's create them
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
             creds.refresh(Request())
         else:
+            # The OAuth flow pulls in a large dependency graph, so only import
+            # it when a new token is actually needed
+            from dotenv import load_dotenv
+            from google_auth_oauthlib.flow import InstalledAppFlow
+            load_dotenv()
+            
             # Create credentials from environment variables
             client_config = {
                 "installed": {
@@ -50,35 +78,44 @@ def get_credentials(service_name: str) -> Credentials:
                 }
             }
             
-            flow = InstalledAppFlow.from_client_config(
-                client_config, SCOPES[service_name])
-            creds = flow.run_local_server(port=0)
+            with _flow_lock:
+                flow = InstalledAppFlow.from_client_config(
+                    client_config, SCOPES[service_name])
+                creds = flow.run_local_server(port=0)
 
         # Save the credentials for the next run
-        with open(token_file, 'wb') as token:
-            pickle.dump(creds, token)
+        with open(token_file, 'w') as token:
+            token.write(creds.to_json())
 
     return creds
 
 def authenticate_all_services():
     """Authenticate all services and return their credentials."""
     credentials = {}
-    for service in SCOPES.keys():
-        try:
-            credentials[service] = get_credentials(service)
-        except Exception as e:
-            print(f"Error authenticating {service}: {str(e)}")
+    # Token loads and refreshes are I/O bound, so overlap them across services
+    with ThreadPoolExecutor(max_workers=len(SCOPES)) as executor:
+        futures = {service: executor.submit(get_credentials, service) for service in SCOPES.keys()}
+        for service, future in futures.items():
+            try:
+                credentials[service] = future.result()
+            except Exception as e:
+                print(f"Error authenticating {service}: {str(e)}")
     return credentials
 
 def check_authentication_status():
     """Check which services have been authenticated."""
     status = {}
     for service in SCOPES.keys():
-        token_file = f'{service}_token.pickle'
-        status[service] = os.path.exists(token_file)
+        status[service] = (
+            os.path.exists(f'{service}_token.json')
+            or os.path.exists(f'{service}_token.pickle')
+        )
     return status
 
 if __name__ == '__main__':
+    from dotenv import load_dotenv
+    load_dotenv()
+    
     print("Google API Authentication Setup")
     print("===============================\n")
     
@@ -109,10 +146,11 @@ if __name__ == '__main__':
     
     credentials = authenticate_all_services()
     
+    final_status = check_authentication_status()
     print("\nFinal authentication status:")
-    for service, is_authenticated in check_authentication_status().items():
+    for service, is_authenticated in final_status.items():
         print(f"- {service}: {'✓' if is_authenticated else '✗'}")
     
-    if not all(check_authentication_status().values()):
+    if not all(final_status.values()):
         print("\n⚠ Some services failed to authenticate. Please check the error messages above.")
         print("You can run this script again to retry the authentication process.") 
\ No newline at end of file
@@ -4,52 +4,95 @@ time_formatting.py
 Utility functions for parsing and formatting time frames from natural language input.
 """
 
+import functools
 import logging
-from datetime import datetime, timedelta, timezone as dt_timezone
-from typing import Optional, Dict
+import re
+import sys
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import Optional, Dict, Tuple
 
 logger = logging.getLogger(__name__)
 
+# All supported time frame phrases, matched in a single scan of the lowered text
+_TIMEFRAME_PATTERN = re.compile(r"this week|next week|today|tomorrow")
+
+# Short messages repeat often in agent loops; longer ones are not worth interning
+_INTERN_MAX_LENGTH = 256
+
+# Fixed offsets shared by every range computation
+_ONE_DAY = timedelta(days=1)
+_ONE_WEEK = timedelta(days=7)
+_END_OF_DAY_OFFSET = timedelta(days=1, microseconds=-1)
+_END_OF_WEEK_OFFSET = timedelta(days=6, hours=23, minutes=59, seconds=59)
+
+def _this_week(midnight: datetime) -> Tuple[datetime, datetime]:
+    # Start of current week (Monday) to end of week (Sunday)
+    start_of_week = midnight - timedelta(days=midnight.weekday())
+    return start_of_week, start_of_week + _END_OF_WEEK_OFFSET
+
+def _next_week(midnight: datetime) -> Tuple[datetime, datetime]:
+    # Start of next week (Monday) to end of next week (Sunday)
+    start_of_week = midnight - timedelta(days=midnight.weekday()) + _ONE_WEEK
+    return start_of_week, start_of_week + _END_OF_WEEK_OFFSET
+
+def _today(midnight: datetime) -> Tuple[datetime, datetime]:
+    return midnight, midnight + _END_OF_DAY_OFFSET
+
+def _tomorrow(midnight: datetime) -> Tuple[datetime, datetime]:
+    start_of_day = midnight + _ONE_DAY
+    return start_of_day, start_of_day + _END_OF_DAY_OFFSET
+
+# Handlers in priority order, used when a message mentions more than one time frame
+_TIMEFRAME_HANDLERS = {
+    'this week': _this_week,
+    'next week': _next_week,
+    'today': _today,
+    'tomorrow': _tomorrow,
+}
+
+# (UTC day ordinal, ISO bounds for every time frame), rebuilt lazily when the day changes.
+# Replaced as one tuple so a concurrent reader never sees a day paired with missing frames.
+_FRAME_CACHE: Tuple[Optional[int], Dict[str, Dict[str, str]]] = (None, {})
+
+def _rebuild_frames(day_ordinal: int) -> Dict[str, Dict[str, str]]:
+    """Recompute the ISO bounds of every time frame for the given UTC day."""
+    global _FRAME_CACHE
+    day = date.fromordinal(day_ordinal)
+    midnight = datetime(day.year, day.month, day.day, tzinfo=dt_timezone.utc)
+    frames = {}
+    for keyword, handler in _TIMEFRAME_HANDLERS.items():
+        start, end = handler(midnight)
+        frames[keyword] = {'timeMin': start.isoformat(), 'timeMax': end.isoformat()}
+    _FRAME_CACHE = (day_ordinal, frames)
+    return frames
+
+@functools.lru_cache(maxsize=512)
+def _match_timeframe(lowered_text: str) -> Optional[str]:
+    """Return the highest priority time frame keyword in a lowered message."""
+    found = set(_TIMEFRAME_PATTERN.findall(lowered_text))
+    if not found:
+        return None
+    return next(keyword for keyword in _TIMEFRAME_HANDLERS if keyword in found)
+
 def extract_timeframe_from_text(text: str) -> Optional[Dict[str, str]]:
     """Extract timeframe from text and return timeMin and timeMax in ISO format."""
     try:
-        now = datetime.now(dt_timezone.utc)
-        # Common time frame patterns
-        if 'this week' in text.lower():
-            # Set time_min to start of current week (Monday)
-            start_of_week = now - timedelta(days=now.weekday())
-            start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
-            # Set time_max to end of week (Sunday)
-            end_of_week = start_of_week + timedelta(days=6, hours=23, minutes=59, seconds=59)
-            return {
-                'timeMin': start_of_week.isoformat(),
-                'timeMax': end_of_week.isoformat()
-            }
-        elif 'next week' in text.lower():
-            # Set time_min to start of next week (Monday)
-            start_of_week = now - timedelta(days=now.weekday()) + timedelta(days=7)
-            start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
-            # Set time_max to end of next week (Sunday)
-            end_of_week = start_of_week + timedelta(days=6, hours=23, minutes=59, seconds=59)
-            return {
-                'timeMin': start_of_week.isoformat(),
-                'timeMax': end_of_week.isoformat()
-            }
-        elif 'today' in text.lower():
-            start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_of_day = start_of_day + timedelta(days=1, microseconds=-1)
-            return {
-                'timeMin': start_of_day.isoformat(),
-                'timeMax': end_of_day.isoformat()
-            }
-        elif 'tomorrow' in text.lower():
-            start_of_day = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-            end_of_day = start_of_day + timedelta(days=1, microseconds=-1)
-            return {
-                'timeMin': start_of_day.isoformat(),
-                'timeMax': end_of_day.isoformat()
-            }
-        return None
+        lowered = text.lower()
+        # Every phrase contains "to" or "week", so most chat messages exit here
+        # without touching the regex or filling the cache
+        if "week" not in lowered and "to" not in lowered:
+            return None
+        if len(lowered) < _INTERN_MAX_LENGTH:
+            # Interned keys let repeated cache lookups compare by identity
+            lowered = sys.intern(lowered)
+        keyword = _match_timeframe(lowered)
+        if keyword is None:
+            return None
+        day_ordinal = datetime.now(dt_timezone.utc).toordinal()
+        cached_day, frames = _FRAME_CACHE
+        if cached_day != day_ordinal:
+            frames = _rebuild_frames(day_ordinal)
+        return dict(frames[keyword])
     except Exception as e:
         logger.error(f"Error extracting time frame: {e}")
-        return None 
\ No newline at end of file
+        return None
@@ -3,6 +3,7 @@ import { format } from 'date-fns';
 import ReactMarkdown from 'react-markdown';
 import remarkGfm from 'remark-gfm';
 import { Message } from '../App';
+import { API_BASE_URL } from '../config';
 
 interface ChatProps {
   messages: Message[];
@@ -39,7 +40,7 @@ const Chat: React.FC<ChatProps> = ({ messages, setMessages, onPreferenceAdded })
     setIsLoading(true);
 
     try {
-      const response = await fetch('http://localhost:8000/api/chat/stream', {
+      const response = await fetch(`${API_BASE_URL}/api/chat/stream`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -1,5 +1,6 @@
 import React, { useEffect, useState, useRef } from 'react';
 import ForceGraph2D from 'react-force-graph-2d';
+import { API_BASE_URL } from '../config';
 
 interface Node {
   id: string;
@@ -38,7 +39,7 @@ const KnowledgeGraph: React.FC<KnowledgeGraphProps> = ({ refresh }) => {
   useEffect(() => {
     setLoading(true);
     console.log('[KG] Fetching knowledge graph from backend...');
-    fetch('http://localhost:8000/api/knowledge-graph')
+    fetch(`${API_BASE_URL}/api/knowledge-graph`)
       .then(res => {
         if (!res.ok) throw new Error('Failed to fetch knowledge graph');
         return res.json();
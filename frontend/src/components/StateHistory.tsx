@@ -1,4 +1,5 @@
 import React, { useEffect, useState } from 'react';
+import { API_BASE_URL } from '../config';
 // If using MUI:
 // import Accordion from '@mui/material/Accordion';
 // import AccordionSummary from '@mui/material/AccordionSummary';
@@ -15,7 +16,7 @@ const StateHistory: React.FC = () => {
   const fetchHistory = async () => {
     setLoading(true);
     try {
-      const res = await fetch('http://localhost:8000/api/state-history');
+      const res = await fetch(`${API_BASE_URL}/api/state-history`);
       if (!res.ok) throw new Error('Failed to fetch state history');
       const data = await res.json();
       setHistory(data.history || []);
@@ -29,7 +30,7 @@ const StateHistory: React.FC = () => {
 
   const clearHistory = async () => {
     try {
-      const res = await fetch('http://localhost:8000/api/state-history/clear', {
+      const res = await fetch(`${API_BASE_URL}/api/state-history/clear`, {
         method: 'POST'
       });
       if (!res.ok) throw new Error('Failed to clear state history');
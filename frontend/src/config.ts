@@ -0,0 +1,2 @@
+// Base URL of the backend API; run.py sets REACT_APP_API_URL when it uses a non-default port
+export const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
@@ -1,11 +1,13 @@
+import errno
+import hashlib
 import logging
 import os
+import selectors
 import signal
+import socket
 import subprocess
 import sys
-import threading
 import time
-import traceback
 from typing import Optional
 
 import requests
@@ -23,60 +25,174 @@ if backend_path not in sys.path:
     sys.path.insert(0, backend_path)
     logger.debug(f"Added {backend_path} to sys.path")
 
-SHUTDOWN_SIGNAL_FILE = "shutdown.signal"
+# Ports and signal file can be overridden so several instances (e.g. parallel e2e workers) can coexist
+BACKEND_PORT = int(os.environ.get("BACKEND_PORT", "8000"))
+FRONTEND_PORT = int(os.environ.get("FRONTEND_PORT", "3000"))
+SHUTDOWN_SIGNAL_FILE = os.environ.get("SHUTDOWN_SIGNAL_FILE", "shutdown.signal")
+# Hot reload is for development; BACKEND_RELOAD=0 skips the file watcher and its supervisor process
+BACKEND_RELOAD = os.environ.get("BACKEND_RELOAD", "1") != "0"
+# Serve an existing production build instead of the dev server when set (used by the e2e tests)
+FRONTEND_BUILD_DIR = os.environ.get("FRONTEND_BUILD_DIR")
+INSTALL_CACHE_FILE = ".install_cache"
+INSTALL_INPUTS = ("backend/setup.py", "backend/requirements.txt")
+PORT_RELEASE_TIMEOUT = 2.0
+HEALTH_CHECK_URL = f"http://localhost:{BACKEND_PORT}/api/health"
+HEALTH_CHECK_ATTEMPTS = 50
+HEALTH_CHECK_INTERVAL = 0.2
+SHUTDOWN_CHECK_INTERVAL = 1.0
 
-def kill_process_on_port(port: int) -> None:
-    """Kill any process running on the specified port."""
+def _deps_fingerprint() -> str:
+    """Hash the backend packaging files and interpreter that pip install -e depends on."""
+    digest = hashlib.blake2b(sys.executable.encode(), digest_size=16)
+    for path in INSTALL_INPUTS:
+        try:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        except FileNotFoundError:
+            continue
+    return digest.hexdigest()
+
+def _read_install_cache() -> Optional[str]:
+    """Return the fingerprint recorded by the last successful install, if any."""
+    try:
+        with open(INSTALL_CACHE_FILE) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+def _port_is_free(port: int) -> bool:
+    """Check whether nothing is listening on the port with one bind attempt per address family.
+
+    Any bind failure other than a missing address family counts as busy, so the caller falls back
+    to the process scan instead of skipping a port it could not actually probe.
+    """
+    probes = [(socket.AF_INET, "0.0.0.0")]
+    if socket.has_ipv6:
+        # Catches listeners bound only to ::1 or IPv6-only, which the IPv4 bind cannot see
+        probes.append((socket.AF_INET6, "::"))
+    for family, host in probes:
+        try:
+            s = socket.socket(family, socket.SOCK_STREAM)
+        except OSError:
+            # IPv6 is compiled in but not available on this host
+            continue
+        with s:
+            # SO_REUSEADDR lets sockets lingering in TIME_WAIT count as free; only a live listener blocks the bind
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                s.bind((host, port))
+            except OSError as e:
+                if e.errno in (errno.EADDRNOTAVAIL, errno.EAFNOSUPPORT):
+                    continue
+                return False
+    return True
+
+def _listening_socket_inodes(ports) -> dict:
+    """Map the inodes of TCP sockets listening on any of the ports to their port, from /proc/net."""
+    inodes = {}
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table) as f:
+                next(f)  # Skip the header row
+                for line in f:
+                    fields = line.split()
+                    # State 0A is TCP_LISTEN; the local address is HEXIP:HEXPORT
+                    if fields[3] != "0A":
+                        continue
+                    port = int(fields[1].rsplit(":", 1)[1], 16)
+                    if port in ports:
+                        inodes[fields[9]] = port
+        except FileNotFoundError:
+            continue
+    return inodes
+
+def _pids_listening_on(ports) -> dict:
+    """Find the PIDs of processes listening on each of the specified ports."""
+    listeners = {port: [] for port in ports}
+    if not sys.platform.startswith("linux"):
+        for port in ports:
+            result = subprocess.run(["lsof", "-i", f":{port}", "-t"], capture_output=True, text=True)
+            listeners[port] = [int(pid) for pid in result.stdout.split()]
+        return listeners
+
+    inodes = _listening_socket_inodes(listeners)
+    if not inodes:
+        return listeners
+    targets = {f"socket:[{inode}]": port for inode, port in inodes.items()}
+    for proc in os.scandir("/proc"):
+        if not proc.name.isdigit():
+            continue
+        try:
+            for fd in os.scandir(f"/proc/{proc.name}/fd"):
+                port = targets.get(os.readlink(fd.path))
+                if port is not None and int(proc.name) not in listeners[port]:
+                    listeners[port].append(int(proc.name))
+        except OSError:
+            # The process exited or belongs to another user
+            continue
+    return listeners
+
+def kill_processes_on_ports(ports) -> None:
+    """Kill any process running on the specified ports."""
     try:
-        logger.debug(f"Checking for processes on port {port}")
-        # Get all processes using the port
-        cmd = f"lsof -i :{port} -t"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        pids = result.stdout.strip().split('\n')
-        logger.debug(f"Found processes on port {port}: {pids}")
+        logger.debug(f"Checking for processes on ports {ports}")
+        # A bind probe is enough to tell a free port apart; only busy ports need the process scan
+        busy_ports = [port for port in ports if not _port_is_free(port)]
+        if not busy_ports:
+            logger.debug(f"Ports {ports} are free")
+            return
+
+        # Get all processes using the busy ports in a single pass
+        listeners = _pids_listening_on(busy_ports)
         
-        for pid in pids:
-            if pid:  # Skip empty strings
+        for port, pids in listeners.items():
+            logger.debug(f"Found processes on port {port}: {pids}")
+            for pid in pids:
                 try:
-                    pid = int(pid)
                     # Skip if it's our own process or our parent
                     if pid != os.getpid() and pid != os.getppid():
                         logger.debug(f"Attempting to kill process {pid} on port {port}")
                         os.kill(pid, signal.SIGTERM)
                         logger.info(f"Killed process {pid} on port {port}")
-                except (ValueError, ProcessLookupError) as e:
+                except ProcessLookupError as e:
                     logger.warning(f"Failed to kill process {pid}: {str(e)}")
                     continue
         
-        # Add a small delay to ensure processes are fully terminated
-        time.sleep(1)
+        if not any(listeners.values()):
+            logger.debug(f"Ports {ports} are free")
+            return
         
-        # Verify the port is free
-        verify_result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        if verify_result.stdout.strip():
-            logger.warning(f"Port {port} is still in use after killing processes")
-        else:
-            logger.debug(f"Port {port} is now free")
+        # Wait for the ports to actually be released rather than sleeping a fixed second
+        deadline = time.monotonic() + PORT_RELEASE_TIMEOUT
+        pending = busy_ports
+        while pending and time.monotonic() < deadline:
+            time.sleep(0.05)
+            pending = [port for port in pending if not _port_is_free(port)]
+
+        for port in busy_ports:
+            if port in pending:
+                logger.warning(f"Port {port} is still in use after killing processes")
+            else:
+                logger.debug(f"Port {port} is now free")
     except Exception as e:
-        logger.error(f"Error killing processes on port {port}: {str(e)}")
-        logger.debug(traceback.format_exc())
+        logger.error(f"Error killing processes on ports {ports}: {str(e)}")
+        logger.debug("Traceback:", exc_info=True)
 
 def run_backend() -> Optional[subprocess.Popen]:
     """Run the backend server as a module from the project root."""
     try:
         logger.debug("Starting backend server setup...")
-        # Kill any existing process on port 8000
-        kill_process_on_port(8000)
         
         # Start the backend server as a module from the project root
-        cmd = [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "0.0.0.0", "--port", "8000", "--reload"]
+        cmd = [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "0.0.0.0", "--port", str(BACKEND_PORT)]
+        if BACKEND_RELOAD:
+            cmd.append("--reload")
         logger.debug(f"Starting backend with command: {' '.join(cmd)}")
         
         backend_process = subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
             cwd=os.path.dirname(__file__)  # Run from project root
         )
         logger.info(f"Started Backend process with PID {backend_process.pid}")
@@ -89,26 +205,52 @@ def run_backend() -> Optional[subprocess.Popen]:
         return backend_process
     except Exception as e:
         logger.error(f"Failed to start backend: {str(e)}")
-        logger.debug(traceback.format_exc())
+        logger.debug("Traceback:", exc_info=True)
         return None
 
+def wait_for_backend_health(backend_process: subprocess.Popen, wait=time.sleep) -> Optional[requests.Response]:
+    """Poll the backend health endpoint until it answers, reusing one pooled connection.
+
+    ``wait`` is called with the delay between attempts; main passes one that keeps
+    streaming the servers' output so their pipes never fill up during startup.
+    """
+    with requests.Session() as session:
+        for _ in range(HEALTH_CHECK_ATTEMPTS):
+            if backend_process.poll() is not None:
+                logger.error(f"Backend process exited during startup with return code {backend_process.poll()}")
+                return None
+            try:
+                return session.get(HEALTH_CHECK_URL, timeout=0.5)
+            except (requests.ConnectionError, requests.Timeout):
+                # Not listening yet, try again shortly
+                wait(HEALTH_CHECK_INTERVAL)
+    logger.error(f"Backend did not respond within {HEALTH_CHECK_ATTEMPTS * HEALTH_CHECK_INTERVAL:.0f} seconds")
+    return None
+
 def run_frontend() -> Optional[subprocess.Popen]:
     """Run the frontend development server."""
     try:
         logger.debug("Starting frontend server setup...")
-        # Kill any existing process on port 3000
-        kill_process_on_port(3000)
         
         # Start the frontend server
         frontend_dir = os.path.join(os.path.dirname(__file__), "frontend")
         logger.debug(f"Starting frontend from directory: {frontend_dir}")
         
+        if FRONTEND_BUILD_DIR:
+            # A static build needs no compile step, so a plain file server is up almost instantly
+            logger.debug(f"Serving prebuilt frontend from {FRONTEND_BUILD_DIR}")
+            cmd = [sys.executable, "-m", "http.server", str(FRONTEND_PORT), "--directory", FRONTEND_BUILD_DIR]
+        else:
+            cmd = ["npm", "start"]
+
+        # Point the dev server and the app's API calls at the configured ports
+        env = dict(os.environ, PORT=str(FRONTEND_PORT), REACT_APP_API_URL=f"http://localhost:{BACKEND_PORT}")
         frontend_process = subprocess.Popen(
-            ["npm", "start"],
+            cmd,
             cwd=frontend_dir,  # Use absolute path
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True
+            env=env
         )
         logger.info(f"Started Frontend process with PID {frontend_process.pid}")
         
@@ -120,24 +262,36 @@ def run_frontend() -> Optional[subprocess.Popen]:
         return frontend_process
     except Exception as e:
         logger.error(f"Failed to start frontend: {str(e)}")
-        logger.debug(traceback.format_exc())
+        logger.debug("Traceback:", exc_info=True)
         return None
 
-def shutdown_watcher(backend_process, frontend_process):
-    logger.debug("Starting shutdown watcher thread")
-    while True:
-        if os.path.exists(SHUTDOWN_SIGNAL_FILE):
-            logger.info("Shutdown signal received. Shutting down servers...")
-            if backend_process:
-                logger.debug("Terminating backend process")
-                backend_process.terminate()
-            if frontend_process:
-                logger.debug("Terminating frontend process")
-                frontend_process.terminate()
-            os.remove(SHUTDOWN_SIGNAL_FILE)
-            logger.info("All processes cleaned up (shutdown signal)")
-            os._exit(0)
-        time.sleep(1)
+def _stream_output(selector: selectors.BaseSelector, pending: dict, out, timeout: float) -> None:
+    """Copy whatever the servers have written to our stdout, waiting up to timeout for output."""
+    for key, _ in selector.select(timeout=timeout):
+        data = os.read(key.fd, 65536)
+        if not data:
+            # EOF, the process has exited; the caller's poll() checks report it.
+            # Emit an unterminated last line (often the crash message) before dropping the stream
+            if pending[key.fd]:
+                out.write(key.data)
+                out.write(pending[key.fd] + b"\n")
+                pending[key.fd].clear()
+            selector.unregister(key.fd)
+            continue
+        # Write complete lines straight through as bytes, keeping any partial line
+        buffer = pending[key.fd]
+        buffer.extend(data)
+        start = 0
+        while (newline := buffer.find(b"\n", start)) != -1:
+            out.write(key.data)
+            out.write(buffer[start:newline + 1])
+            start = newline + 1
+        del buffer[:start]
+    out.flush()
+
+def _handle_termination(signum, frame):
+    """Turn SIGTERM into the same clean shutdown path as Ctrl+C."""
+    raise KeyboardInterrupt
 
 def main():
     """Main function to run both frontend and backend servers."""
@@ -145,20 +299,30 @@ def main():
         # Ensure we're in the project root
         os.chdir(os.path.dirname(__file__))
         logger.info(f"Working directory set to: {os.getcwd()}")
+        signal.signal(signal.SIGTERM, _handle_termination)
 
-        # Install the backend package in development mode
-        logger.info("Installing backend package in development mode (from main)...")
-        install_process = subprocess.run(
-            [sys.executable, "-m", "pip", "install", "-e", "backend"],
-            capture_output=True,
-            text=True
-        )
-        if install_process.returncode != 0:
-            logger.error(f"Failed to install backend package: {install_process.stderr}")
-            logger.debug(f"Install process stdout: {install_process.stdout}")
-            return
-        logger.info("Backend package installed successfully (from main)")
+        # Install the backend package in development mode, unless nothing it depends on changed
+        fingerprint = _deps_fingerprint()
+        if _read_install_cache() == fingerprint:
+            logger.info("Backend package is up to date, skipping install")
+        else:
+            logger.info("Installing backend package in development mode (from main)...")
+            install_process = subprocess.run(
+                [sys.executable, "-m", "pip", "install", "-e", "backend"],
+                capture_output=True,
+                text=True
+            )
+            if install_process.returncode != 0:
+                logger.error(f"Failed to install backend package: {install_process.stderr}")
+                logger.debug(f"Install process stdout: {install_process.stdout}")
+                return
+            with open(INSTALL_CACHE_FILE, "w") as f:
+                f.write(fingerprint)
+            logger.info("Backend package installed successfully (from main)")
         
+        # Free the backend and frontend ports in one pass
+        kill_processes_on_ports((BACKEND_PORT, FRONTEND_PORT))
+
         # Start backend
         logger.info("Starting backend server...")
         backend_process = run_backend()
@@ -166,53 +330,57 @@ def main():
             logger.error("Failed to start backend server")
             return
 
-        # Wait a moment to ensure backend is up
-        logger.debug("Waiting for backend to start...")
-        time.sleep(2)
-        
-        # Verify backend is running
+        # Start the frontend right away so its compile overlaps the backend's startup
+        logger.info("Starting frontend server...")
+        frontend_process = run_frontend()
+        if not frontend_process:
+            logger.error("Failed to start frontend server")
+            return
+
+        # Stream output from both processes as it becomes available, starting before the
+        # health wait so neither child blocks on a full pipe while the backend starts up
+        logger.debug("Starting to stream process output")
+        selector = selectors.DefaultSelector()
+        out = sys.stdout.buffer
+        pending = {}
+        for name, process in (("BACKEND", backend_process), ("FRONTEND", frontend_process)):
+            os.set_blocking(process.stdout.fileno(), False)
+            selector.register(process.stdout.fileno(), selectors.EVENT_READ, f"[{name}] ".encode())
+            pending[process.stdout.fileno()] = bytearray()
+
+        def stream_for(seconds: float) -> None:
+            until = time.monotonic() + seconds
+            while (remaining := until - time.monotonic()) > 0:
+                _stream_output(selector, pending, out, remaining)
+
+        # Wait for the backend to come up and verify it is healthy
         try:
-            logger.debug("Checking backend health...")
-            response = requests.get("http://localhost:8000/api/health")
+            logger.debug("Waiting for backend health check...")
+            response = wait_for_backend_health(backend_process, wait=stream_for)
+            if response is None:
+                return
             if response.status_code != 200:
                 logger.error(f"Backend health check failed with status {response.status_code}")
                 logger.debug(f"Health check response: {response.text}")
-                backend_process.terminate()
                 return
             logger.info("Backend health check passed")
         except Exception as e:
             logger.error(f"Backend health check failed: {str(e)}")
-            logger.debug(traceback.format_exc())
-            backend_process.terminate()
-            return
-
-        # Start frontend
-        logger.info("Starting frontend server...")
-        frontend_process = run_frontend()
-        if not frontend_process:
-            logger.error("Failed to start frontend server")
-            backend_process.terminate()
+            logger.debug("Traceback:", exc_info=True)
             return
 
-        # Start shutdown watcher thread
-        logger.debug("Starting shutdown watcher thread")
-        watcher_thread = threading.Thread(target=shutdown_watcher, args=(backend_process, frontend_process), daemon=True)
-        watcher_thread.start()
-
-        # Stream output from both processes
-        logger.debug("Starting to stream process output")
+        next_shutdown_check = time.monotonic() + SHUTDOWN_CHECK_INTERVAL
         while True:
-            # Print all available backend output immediately
-            backend_line = backend_process.stdout.readline()
-            while backend_line:
-                print(f"[BACKEND] {backend_line.strip()}")
-                backend_line = backend_process.stdout.readline()
-
-            # Print all available frontend output
-            frontend_line = frontend_process.stdout.readline()
-            while frontend_line:
-                print(f"[FRONTEND] {frontend_line.strip()}")
-                frontend_line = frontend_process.stdout.readline()
+            _stream_output(selector, pending, out, timeout=1.0)
+
+            # The backend's /shutdown endpoint requests a stop by writing the signal file;
+            # look for it at most once per interval, busy or idle
+            if time.monotonic() >= next_shutdown_check:
+                next_shutdown_check = time.monotonic() + SHUTDOWN_CHECK_INTERVAL
+                if os.path.exists(SHUTDOWN_SIGNAL_FILE):
+                    logger.info("Shutdown signal received. Shutting down servers...")
+                    os.remove(SHUTDOWN_SIGNAL_FILE)
+                    break
 
             # Check if either process has ended
             if backend_process.poll() is not None:
@@ -222,14 +390,11 @@ def main():
                 logger.error(f"Frontend process ended unexpectedly with return code {frontend_process.poll()}")
                 break
 
-            # Small sleep to prevent CPU spinning
-            time.sleep(0.1)
-
     except KeyboardInterrupt:
         logger.info("Received keyboard interrupt. Shutting down...")
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
-        logger.debug(traceback.format_exc())
+        logger.debug("Traceback:", exc_info=True)
     finally:
         # Clean up processes
         if 'backend_process' in locals() and backend_process:
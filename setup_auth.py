@@ -38,10 +38,11 @@ def main():
 
     credentials = authenticate_all_services()
 
+    final_status = check_authentication_status()
     print("\nFinal authentication status:")
-    for service, is_authenticated in check_authentication_status().items():
+    for service, is_authenticated in final_status.items():
         print(f"- {service}: {'✓' if is_authenticated else '✗'}")
-    if not all(check_authentication_status().values()):
+    if not all(final_status.values()):
         print("\n⚠ Some services failed to authenticate. Please check the error messages above.")
         print("You can run this script again to retry the authentication process.")
 
@@ -11,29 +11,104 @@ This script runs all tests in the project and generates detailed reports includi
 
 import argparse
 import asyncio
+import importlib.util
 import json
 import os
 import re
+import shutil
 import subprocess
 import sys
-import time
+import threading
 import traceback
+import uuid
 import xml.etree.ElementTree as ET
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, ClassVar
 from unittest.mock import patch
 
 import pytest
 
+# Directories never searched for tests, matched by exact name
+SKIP_DIRECTORIES = frozenset({'venv', '.venv', '__pycache__', '.pytest_cache', 'node_modules', '.git'})
+
+# Coverage summary printed at the end of some pytest-cov runs, e.g. '89% coverage'
+COVERAGE_PATTERN = re.compile(r'(\d+)%\s+coverage')
+
+def _drain_pipe(pipe, lines: List[str], echo: bool):
+    """Read a child pipe to EOF, keeping every line and optionally echoing it to the console."""
+    for count, line in enumerate(iter(pipe.readline, ''), 1):
+        lines.append(line)
+        if echo:
+            sys.stdout.write(line)
+            # Flush in batches rather than per line to keep up with chatty test output
+            if count % 64 == 0:
+                sys.stdout.flush()
+    if echo:
+        sys.stdout.flush()
+    pipe.close()
+
+# Longest traceback kept per test; the end of a traceback carries the actual error
+MAX_TRACEBACK_CHARS = 8192
+
+def _cap_output(output: Optional[str], limit: int = MAX_TRACEBACK_CHARS) -> Optional[str]:
+    """Keep only the tail of captured output, marking where it was cut."""
+    if output and len(output) > limit:
+        return '...' + output[-limit:]
+    return output
+
+def _collected_test_names(output: bytes) -> List[str]:
+    """Extract test node IDs from pytest --collect-only -q output.
+
+    The node IDs are listed first, one per line, and end at the first blank line;
+    only those lines are decoded, and any summary or warnings below are skipped.
+    """
+    test_names = []
+    for line in output.splitlines():
+        line = line.strip()
+        if not line:
+            if test_names:
+                break
+            continue
+        # Module level tests are file::test, class based ones file::Class::test
+        if b'::' in line and b'test_' in line:
+            test_names.append(line.decode('utf-8', errors='replace'))
+    return test_names
+
 class TestRunner:
     """Comprehensive test runner for the entire project."""
     
-    def __init__(self, project_root: str):
+    # Flags shared by every pytest run; coverage flags are added only when enabled
+    BASE_PYTEST_FLAGS: ClassVar[Tuple[str, ...]] = ('-v', '--tb=short', '--no-header', '--disable-warnings')
+    COVERAGE_FLAGS: ClassVar[Tuple[str, ...]] = ('--cov=backend', '--cov-report=term')
+    
+    def __init__(self, project_root: str, jobs: str = 'auto', with_coverage: bool = True, failed_first: bool = False,
+                 isolate: bool = False):
         self.project_root = Path(project_root)
+        # Number of pytest-xdist workers for parallel runs ('auto' uses every core)
+        self.jobs = jobs
+        # Coverage tracing slows every test down, so it can be turned off for quick runs
+        self.with_coverage = with_coverage
+        # Rerun only the tests that failed last time (pytest's --lf)
+        self.failed_first = failed_first
+        # Run each test in a forked child so a crash only takes down that test
+        self.isolate = isolate
+        # One timestamp for the whole run, shared by the report body and its file name
+        self._run_started = datetime.now()
         self.test_logs_dir = self.project_root / "test_logs"
         self.test_logs_dir.mkdir(exist_ok=True)
         
+        # Collected test names per file, persisted across runs and keyed by file stat
+        self.collect_cache_path = self.test_logs_dir / ".collect_cache.json"
+        self._collect_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        # Node IDs of the tests that failed in the previous run
+        self.last_failed_path = self.test_logs_dir / "last_failed.json"
+        
+        # JUnit classname -> (file path, node ID prefix), and dotted module -> exists on disk
+        self._test_locations: Dict[str, Tuple[str, str]] = {}
+        self._module_files: Dict[str, bool] = {}
+        
         # Test results storage
         self.test_results: Dict[str, Dict[str, Any]] = {}
         self.total_tests = 0
@@ -43,15 +118,31 @@ class TestRunner:
         self.coverage = 0
         
     def _clean_test_logs(self):
-        """Remove all old log files from the test_logs directory."""
+        """Remove all old log files from the test_logs directory.
+
+        The directory is swapped for an empty one and the old copy is deleted on a
+        background thread, so the run does not wait on one unlink per file.
+        """
         print(f"🧹 Cleaning test logs in {self.test_logs_dir}...")
+        trash_dir = self.test_logs_dir.with_name(f"{self.test_logs_dir.name}_old_{uuid.uuid4().hex}")
+        try:
+            os.rename(self.test_logs_dir, trash_dir)
+        except OSError as e:
+            print(f"Error cleaning {self.test_logs_dir}: {e}")
+            return
+        self.test_logs_dir.mkdir(exist_ok=True)
+        
+        # Only top-level JSON logs are cleaned; move everything else (e.g. 'older') back,
+        # along with the runner's own state (collection cache, last failed tests)
+        state_files = {self.collect_cache_path.name, self.last_failed_path.name}
         cleaned_count = 0
-        for file in self.test_logs_dir.glob('*.json'):
-            try:
-                file.unlink()
-                cleaned_count += 1
-            except OSError as e:
-                print(f"Error deleting file {file}: {e}")
+        with os.scandir(trash_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith('.json') and entry.name not in state_files:
+                    cleaned_count += 1
+                else:
+                    os.rename(entry.path, self.test_logs_dir / entry.name)
+        threading.Thread(target=shutil.rmtree, args=(trash_dir,), kwargs={'ignore_errors': True}).start()
         print(f"  - Deleted {cleaned_count} log file(s).")
     
     def _organize_test_reports(self):
@@ -87,203 +178,181 @@ class TestRunner:
         else:
             print(f"📁 No old reports to move (keeping latest 5)")
     
+    def _walk_tests(self, directory: str):
+        """Yield test file paths under a directory, pruning skipped directories before descending."""
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRECTORIES:
+                        yield from self._walk_tests(entry.path)
+                elif entry.name.startswith('test_') and entry.name.endswith('.py') and entry.is_file():
+                    yield entry.path
+    
     def discover_tests(self) -> List[str]:
         """Discover all test files in the project."""
-        test_files = []
-        
-        # Find all test files recursively
-        for root, dirs, files in os.walk(self.project_root):
-            # Skip virtual environments and cache directories
-            if any(skip in root for skip in ['venv', '__pycache__', '.pytest_cache', 'node_modules']):
-                continue
-                
-            for file in files:
-                if file.startswith('test_') and file.endswith('.py'):
-                    test_path = Path(root) / file
-                    # Convert to relative path from project root
-                    relative_path = test_path.relative_to(self.project_root)
-                    test_files.append(str(relative_path))
-        
-        return sorted(test_files)
+        # Convert to relative paths from project root
+        return sorted(
+            os.path.relpath(path, self.project_root)
+            for path in self._walk_tests(str(self.project_root))
+        )
     
-    def collect_test_names(self, test_file: str) -> List[str]:
-        """Collect all test function names from a test file."""
+    def _load_collect_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Load the on-disk collection cache once per process."""
+        if self._collect_cache is None:
+            try:
+                with open(self.collect_cache_path) as f:
+                    self._collect_cache = json.load(f)
+            except (OSError, ValueError):
+                self._collect_cache = {}
+        return self._collect_cache
+    
+    def _save_collect_cache(self):
+        """Write the collection cache atomically so a crash never leaves it half written."""
+        temp_path = self.collect_cache_path.with_suffix('.tmp')
         try:
-            # Use pytest to collect test names without running them
-            result = subprocess.run(
-                [sys.executable, '-m', 'pytest', test_file, '--collect-only', '-q'],
-                capture_output=True,
-                text=True,
-                cwd=self.project_root,
-                timeout=30
-            )
-            
-            test_names = []
-            for line in result.stdout.split('\n'):
-                if '::' in line and 'test_' in line:
-                    # Extract test name from pytest output
-                    parts = line.strip().split('::')
-                    if len(parts) >= 3:
-                        test_names.append(f"{parts[0]}::{parts[1]}::{parts[2]}")
-            
-            # If no tests found with the above method, try a different approach
-            if not test_names:
-                # Try running with more verbose output
+            with open(temp_path, 'w') as f:
+                json.dump(self._collect_cache, f)
+            os.replace(temp_path, self.collect_cache_path)
+        except OSError as e:
+            print(f"Error saving collection cache: {e}")
+    
+    def _file_signature(self, test_file: str) -> List[int]:
+        """Return the (mtime_ns, size) pair that keys a file's cached collection."""
+        stat = (self.project_root / test_file).stat()
+        return [stat.st_mtime_ns, stat.st_size]
+    
+    def collect_test_names(self, test_file: str) -> List[str]:
+        """Collect all test function names from a test file, reusing cached results for unchanged files."""
+        return self.collect_all_test_names([test_file]).get(test_file, [])
+    
+    def collect_all_test_names(self, test_files: Optional[List[str]] = None) -> Dict[str, List[str]]:
+        """Collect test names for many files, running pytest once for every file not already cached."""
+        if test_files is None:
+            test_files = self.discover_tests()
+        cache = self._load_collect_cache()
+        
+        signatures = {}
+        stale_files = []
+        for test_file in test_files:
+            try:
+                signatures[test_file] = self._file_signature(test_file)
+            except OSError as e:
+                print(f"Error collecting tests from {test_file}: {e}")
+                continue
+            cached = cache.get(test_file)
+            if cached is None or cached['signature'] != signatures[test_file]:
+                stale_files.append(test_file)
+        
+        if stale_files:
+            try:
                 result = subprocess.run(
-                    [sys.executable, '-m', 'pytest', test_file, '--collect-only', '-v'],
+                    [sys.executable, '-m', 'pytest', *stale_files, '--collect-only', '-q'],
                     capture_output=True,
-                    text=True,
                     cwd=self.project_root,
-                    timeout=30
+                    timeout=120
                 )
-                
-                for line in result.stdout.split('\n'):
-                    if '::' in line and 'test_' in line:
-                        parts = line.strip().split('::')
-                        if len(parts) >= 3:
-                            test_names.append(f"{parts[0]}::{parts[1]}::{parts[2]}")
-            
-            return test_names
-        except Exception as e:
-            print(f"Error collecting tests from {test_file}: {e}")
-            return []
+                # Partition the collected node IDs by the file part before the first '::'
+                grouped: Dict[str, List[str]] = {}
+                for test_name in _collected_test_names(result.stdout):
+                    grouped.setdefault(test_name.split('::', 1)[0], []).append(test_name)
+                for test_file in stale_files:
+                    if grouped.get(test_file):
+                        cache[test_file] = {'signature': signatures[test_file], 'tests': grouped[test_file]}
+                self._save_collect_cache()
+            except Exception as e:
+                print(f"Error collecting tests: {e}")
+        
+        return {
+            test_file: list(cache[test_file]['tests'])
+            for test_file in signatures
+            if test_file in cache and cache[test_file]['signature'] == signatures[test_file]
+        }
+    
+    def run_tests(self, node_ids: List[str]) -> Dict[str, Any]:
+        """Run the given test node IDs in a single pytest invocation."""
+        print(f"🚀 Running {len(node_ids)} selected test(s)...")
+        cmd = self._pytest_command(*node_ids)
+        self._execute_test_run(cmd, parallel=False)
+        return self.generate_report()
+    
+    def run_interactive(self):
+        """Run tests named on stdin inside this process, so imports are paid only once.
+
+        Modules imported by earlier runs stay loaded, so restart the session after
+        editing backend code.
+        """
+        print("Enter test node IDs separated by spaces, or a blank line to quit.")
+        os.chdir(self.project_root)
+        while True:
+            try:
+                line = input("test> ").strip()
+            except EOFError:
+                break
+            if not line:
+                break
+            exit_code = pytest.main([*line.split(), *self.BASE_PYTEST_FLAGS])
+            print(f"pytest exited with code {int(exit_code)}")
+    
+    def _pytest_command(self, *args: str) -> List[str]:
+        """Build a pytest command for the given targets and options plus the shared flags."""
+        return [sys.executable, '-m', 'pytest', *args, *self.BASE_PYTEST_FLAGS]
     
     def run_single_test(self, test_name: str) -> Dict[str, Any]:
-        """Run a single test and capture results."""
-        start_time = time.time()
-        result = {
-            'test_name': test_name,
-            'status': 'unknown',
-            'runtime': 0.0,
-            'error': None,
-            'error_type': None,
-            'error_traceback': None,
-            'stdout': '',
-            'stderr': ''
-        }
-        
-        try:
-            # Run the test with pytest
-            cmd = [
-                sys.executable, '-m', 'pytest', 
-                test_name, 
-                '-v', 
-                '--tb=short',
-                '--no-header',
-                '--disable-warnings',
-                '--cov=backend',
-                '--cov-report=term'
-            ]
-            
-            process = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                cwd=self.project_root,
-                timeout=120  # 2 minute timeout per test
-            )
-            
-            result['runtime'] = time.time() - start_time
-            result['stdout'] = process.stdout
-            result['stderr'] = process.stderr
-            
-            # Determine test status based on return code
-            if process.returncode == 0:
-                result['status'] = 'passed'
-                self.passed_tests += 1
-            else:
-                result['status'] = 'failed'
-                self.failed_tests += 1
-                
-                # Combine stdout and stderr to ensure we capture the traceback
-                full_output = process.stdout + '\n' + process.stderr
-                result['error_traceback'] = full_output
-                
-                # Extract a more specific error message
-                error_summary = [line for line in full_output.split('\n') if line.strip().startswith('E ')]
-                if error_summary:
-                    result['error'] = error_summary[0].strip()
-                else:
-                    result['error'] = f"Test failed with return code {process.returncode}"
-                result['error_type'] = 'TestFailure'
-                
-                # Extract coverage percentage from the output
-                coverage_line = [line for line in full_output.split('\n') if 'TOTAL' in line]
-                if coverage_line:
-                    try:
-                        coverage_str = coverage_line[0].split()[-1].replace('%', '')
-                        self.coverage = int(coverage_str)
-                    except (ValueError, IndexError):
-                        pass # Ignore parsing errors
-                
-        except subprocess.TimeoutExpired as e:
-            result['runtime'] = time.time() - start_time
-            result['status'] = 'timeout'
-            result['error'] = 'Test timed out after 120 seconds'
-            result['error_type'] = 'TimeoutError'
-            self.error_tests += 1
-            
-        except Exception as e:
-            result['runtime'] = time.time() - start_time
-            result['status'] = 'error'
-            result['error'] = str(e)
-            result['error_type'] = type(e).__name__
-            result['error_traceback'] = traceback.format_exc()
-            self.error_tests += 1
-            
-        self.total_tests += 1
-        return result
+        """Run a single test; a thin wrapper around run_tests."""
+        return self.run_tests([test_name])
     
     def run_integration_tests(self, exclude_long=False) -> Dict[str, Any]:
         """Run integration tests in parallel by default, serially only when long tests are included."""
         if exclude_long:
             print("🔍 Running integration tests in parallel (excluding long tests)...")
             # Run integration tests in parallel, excluding the long subdirectory
-            cmd = [
-                sys.executable, '-m', 'pytest', 
-                'backend/tests/integration/', 
-                '--ignore', 'backend/tests/integration/long/',
-                '-v', 
-                '--tb=short',
-                '--no-header',
-                '--disable-warnings',
-                '--cov=backend',
-                '--cov-report=term'
-            ]
+            cmd = self._pytest_command(
+                'backend/tests/integration/',
+                '--ignore', 'backend/tests/integration/long/'
+            )
             self._execute_test_run(cmd, parallel=True)
         else:
             print("🔍 Running ALL integration tests serially (including long tests)...")
             # Run all integration tests including long ones serially to avoid rate limiting
-            cmd = [
-                sys.executable, '-m', 'pytest', 
-                'backend/tests/integration/', 
-                '-v', 
-                '--tb=short',
-                '--no-header',
-                '--disable-warnings',
-                '--cov=backend',
-                '--cov-report=term'
-            ]
+            cmd = self._pytest_command('backend/tests/integration/')
             self._execute_test_run(cmd, parallel=False)
         
         return self.generate_report()
 
-    def _execute_test_run(self, cmd: List[str], parallel: bool = False):
+    def _execute_test_run(self, cmd: List[str], parallel: bool = False, dist: str = 'loadfile'):
         """A helper function to execute a pytest command and parse results.
         
         Args:
             cmd: The pytest command to execute
             parallel: Whether to run tests in parallel (default: False for serial execution)
+            dist: pytest-xdist distribution mode used when running in parallel
         """
         # Create a unique path for the JUnit XML report
-        timestamp = datetime.now().strftime('%Y%m%d%H%M%S%f')
-        junit_xml_path = self.test_logs_dir / f"temp_junit_report_{timestamp}.xml"
+        junit_xml_path = self.test_logs_dir / f"temp_junit_report_{uuid.uuid4().hex}.xml"
         cmd.append(f"--junit-xml={junit_xml_path}")
+        # Also stream one JSON line per test outcome when pytest-reportlog is installed; this
+        # survives crashes that leave the JUnit XML missing or truncated
+        report_log_path = None
+        if importlib.util.find_spec('pytest_reportlog') is not None:
+            report_log_path = junit_xml_path.with_suffix('.jsonl')
+            cmd.append(f"--report-log={report_log_path}")
+        if self.with_coverage:
+            cmd.extend(self.COVERAGE_FLAGS)
+        if self.failed_first:
+            cmd.append('--lf')
+        if self.isolate:
+            if importlib.util.find_spec('pytest_forked') is not None:
+                cmd.append('--forked')
+            else:
+                print("⚠️ pytest-forked is not installed, running tests without isolation.")
 
         # Add parallelization options if requested
         if parallel:
-            # Use pytest-xdist for parallel execution
-            cmd.extend(['-n', 'auto'])  # Auto-detect number of workers
+            if importlib.util.find_spec('xdist') is not None:
+                # Use pytest-xdist; loadfile keeps each file on one worker so per-file results stay grouped
+                cmd.extend(['-n', str(self.jobs), f'--dist={dist}'])
+            else:
+                print("⚠️ pytest-xdist is not installed, running tests serially.")
         # For serial execution, no additional options needed (pytest runs serially by default)
 
         try:
@@ -298,56 +367,47 @@ class TestRunner:
                 encoding='utf-8'
             )
 
-            stdout_lines = []
-            if process.stdout:
-                for line in iter(process.stdout.readline, ''):
-                    print(line, end='') # Stream to console
-                    stdout_lines.append(line)
-                process.stdout.close()
+            # Drain both pipes on background threads so a full stderr pipe can never stall pytest
+            stdout_lines: List[str] = []
+            stderr_lines: List[str] = []
+            readers = [
+                threading.Thread(target=_drain_pipe, args=(process.stdout, stdout_lines, True), daemon=True),
+                threading.Thread(target=_drain_pipe, args=(process.stderr, stderr_lines, False), daemon=True),
+            ]
+            for reader in readers:
+                reader.start()
             
             # Increase timeout for serial execution (integration tests)
             timeout = 1800 if not parallel else 900  # 30 min for serial, 15 min for parallel
             process.wait(timeout=timeout)
+            for reader in readers:
+                reader.join()
             
-            full_output = "".join(stdout_lines)
-
-            print("\n\n--- Captured Pytest Output for Debugging ---")
-            print(full_output)
-            print("--------------------------------------------\n")
+            # stdout was already streamed to the console; re-display it only when debugging
+            if os.environ.get('PT_RUNNER_DEBUG') == '1':
+                print("\n\n--- Captured Pytest Output for Debugging ---")
+                print("".join(stdout_lines))
+                print("--------------------------------------------\n")
+            if stderr_lines:
+                print("\n--- Captured Pytest Stderr ---")
+                print("".join(stderr_lines))
 
             # --- Parse JUnit XML for detailed results ---
-            if junit_xml_path.exists():
-                self._parse_junit_xml(junit_xml_path)
-                # Clean up the temp file
-                os.remove(junit_xml_path)
-            else:
-                print("⚠️ JUnit XML report not found. Cannot determine individual test results.")
-                # Clear test_results to indicate failure to parse details
-                self.test_results.clear()
+            parsed = junit_xml_path.exists() and self._parse_junit_xml(junit_xml_path)
+            if not parsed:
+                if report_log_path is not None and report_log_path.exists():
+                    print("⚠️ JUnit XML report unusable, falling back to the pytest report log.")
+                    self._parse_report_log(report_log_path)
+                else:
+                    print("⚠️ JUnit XML report not found. Cannot determine individual test results.")
+                    # Clear test_results to indicate failure to parse details
+                    self.test_results.clear()
 
-            # --- Parse Coverage from stdout ---
-            coverage_line = [line for line in full_output.split('\n') if line.startswith('TOTAL')]
-            if coverage_line:
-                try:
-                    # The line looks like: 'TOTAL 125 13 89%'
-                    coverage_str = coverage_line[0].split()[-1].replace('%', '')
-                    self.coverage = int(coverage_str)
-                except (ValueError, IndexError):
-                    self.coverage = -1 # Indicates parsing error
+            # --- Parse Coverage from the already captured stdout lines ---
+            if self.with_coverage:
+                self._parse_coverage(stdout_lines)
             else:
-                # Fallback for when TOTAL line isn't present in the combined output
-                final_line = full_output.strip().split('\n')[-1]
-                if 'coverage' in final_line:
-                    try:
-                        # The line might look like: '... 14 passed ... 89% coverage'
-                        coverage_match = re.search(r'(\d+)%\s+coverage', final_line)
-                        if coverage_match:
-                            coverage_str = coverage_match.group(1)
-                            self.coverage = int(coverage_str)
-                        else:
-                            self.coverage = -2 # Indicates secondary parsing error
-                    except(ValueError, IndexError):
-                        self.coverage = -2 # Indicates secondary parsing error
+                self.coverage = None
 
         except subprocess.TimeoutExpired:
             print("Test run timed out.")
@@ -357,33 +417,89 @@ class TestRunner:
         except Exception as e:
             print(f"Error running test suite: {e}")
             self.error_tests = self.total_tests - self.passed_tests
+        finally:
+            # Clean up the temp files, including when the run failed or timed out
+            junit_xml_path.unlink(missing_ok=True)
+            if report_log_path is not None:
+                report_log_path.unlink(missing_ok=True)
+
+    def _parse_coverage(self, stdout_lines: List[str]):
+        """Set self.coverage from the pytest-cov output in a single pass over the captured lines."""
+        final_line = ''
+        for line in stdout_lines:
+            if line.startswith('TOTAL'):
+                try:
+                    # The line looks like: 'TOTAL 125 13 89%'
+                    self.coverage = int(line.split()[-1].replace('%', ''))
+                except (ValueError, IndexError):
+                    self.coverage = -1 # Indicates parsing error
+                return
+            if line.strip():
+                final_line = line
+        
+        # Fallback for when TOTAL line isn't present in the combined output
+        if 'coverage' in final_line:
+            # The line might look like: '... 14 passed ... 89% coverage'
+            coverage_match = COVERAGE_PATTERN.search(final_line)
+            if coverage_match:
+                self.coverage = int(coverage_match.group(1))
+            else:
+                self.coverage = -2 # Indicates secondary parsing error
 
-    def _parse_junit_xml(self, xml_path: Path):
-        """Parse the JUnit XML report to populate test results."""
+    def _resolve_test_location(self, classname: str) -> Tuple[str, str]:
+        """Map a JUnit classname to its test file path and its pytest node ID prefix.
+
+        The file path is '' unless the classname names a module directly; the node
+        prefix is '' if no module along the classname exists on disk. Results are
+        memoized per classname, and disk checks per dotted module, for the runner's lifetime.
+        """
+        location = self._test_locations.get(classname)
+        if location is not None:
+            return location
+        
+        location = ("", "")
+        parts = classname.split('.')
+        # Try the longest module path first; any remaining parts are nested test classes
+        for split_at in range(len(parts), 1, -1):
+            module = '.'.join(parts[:split_at])
+            # Assuming the path is something like backend/tests/unit/test_agent
+            potential_path = f"{module.replace('.', '/')}.py"
+            is_file = self._module_files.get(module)
+            if is_file is None:
+                is_file = self._module_files[module] = self.project_root.joinpath(potential_path).exists()
+            if is_file:
+                file_path = potential_path if split_at == len(parts) else ""
+                location = (file_path, '::'.join([potential_path, *parts[split_at:]]))
+                break
+        self._test_locations[classname] = location
+        return location
+
+    def _parse_junit_xml(self, xml_path: Path) -> bool:
+        """Parse the JUnit XML report to populate test results; returns False if it could not be parsed."""
         try:
-            tree = ET.parse(xml_path)
-            root = tree.getroot()
-            
-            all_test_cases = list(root.iter('testcase'))
-            total_tests_in_xml = len(all_test_cases)
-            
-            for i, testcase in enumerate(all_test_cases):
-                class_name = testcase.attrib.get('classname', '').replace('.', '/')
+            # Stream the report so each result is shown as soon as it is parsed;
+            # the suite totals arrive on the opening testsuite tag
+            total_tests_in_xml = 0
+            i = 0
+            for event, element in ET.iterparse(str(xml_path), events=('start', 'end')):
+                if event == 'start':
+                    if element.tag == 'testsuite':
+                        total_tests_in_xml += int(element.attrib.get('tests', 0))
+                    continue
+                if element.tag != 'testcase':
+                    continue
+                
+                testcase = element
+                classname = testcase.attrib.get('classname', '')
                 test_name_only = testcase.attrib.get('name', 'unknown_test')
                 
                 # Reconstruct the full test name in pytest format
                 # e.g., backend/tests/unit/test_agent.py::TestClassName::test_method_name
                 
-                # Attempt to find the file path from classname
-                file_path = ""
-                parts = class_name.split('/')
-                if len(parts) > 1:
-                    # Assuming the path is something like backend/tests/unit/test_agent
-                    potential_path = f"{'/'.join(parts)}.py"
-                    if self.project_root.joinpath(potential_path).exists():
-                        file_path = potential_path
-
-                full_test_name = f"{file_path}::{testcase.attrib.get('classname', '')}::{test_name_only}"
+                # Attempt to find the file path from classname, memoized across the run
+                file_path, node_prefix = self._resolve_test_location(classname)
+
+                full_test_name = f"{file_path}::{classname}::{test_name_only}"
                 
                 runtime = float(testcase.attrib.get('time', 0.0))
                 status = 'passed'
@@ -396,31 +512,74 @@ class TestRunner:
                 if failure is not None:
                     status = 'failed'
                     error_info = failure.attrib.get('message', 'No message')
-                    error_traceback = failure.text
+                    error_traceback = _cap_output(failure.text)
                 elif error is not None:
                     status = 'error'
                     error_info = error.attrib.get('message', 'No message')
-                    error_traceback = error.text
+                    error_traceback = _cap_output(error.text)
                 
                 self.test_results[full_test_name] = {
                     'test_name': full_test_name,
                     'status': status,
                     'runtime': runtime,
                     'error': error_info,
-                    'error_traceback': error_traceback
+                    'error_traceback': error_traceback,
+                    'node_id': f"{node_prefix}::{test_name_only}" if node_prefix else None
                 }
                 
+                # Drop the parsed element so memory stays flat for large reports
+                testcase.clear()
+                i += 1
+                
                 # --- Live Progress Update ---
-                progress = (i + 1) / total_tests_in_xml * 100
+                progress = i / max(total_tests_in_xml, i) * 100
                 status_icon = "✅" if status == 'passed' else "❌"
                 print(f"\r[{progress:3.0f}%] {status_icon} Running: {test_name_only} ({runtime:.2f}s)", end="", flush=True)
 
             print() # Newline after progress bar is complete
+            return True
 
         except ET.ParseError as e:
             print(f"Error parsing JUnit XML: {e}")
         except Exception as e:
             print(f"An unexpected error occurred during XML parsing: {e}")
+        return False
+
+    def _parse_report_log(self, log_path: Path):
+        """Populate test results from a pytest-reportlog NDJSON file, one TestReport per line."""
+        self.test_results.clear()
+        with open(log_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # The last line may be cut short if pytest crashed mid-write
+                    continue
+                if entry.get('$report_type') != 'TestReport':
+                    continue
+                
+                node_id = entry['nodeid']
+                result = self.test_results.setdefault(node_id, {
+                    'test_name': node_id,
+                    'status': 'passed',
+                    'runtime': 0.0,
+                    'error': None,
+                    'error_traceback': None,
+                    'node_id': node_id
+                })
+                result['runtime'] += entry.get('duration') or 0.0
+                if entry.get('outcome') != 'failed':
+                    continue
+                # A failure outside the test body itself (setup/teardown) is an error
+                result['status'] = 'failed' if entry.get('when') == 'call' else 'error'
+                longrepr = entry.get('longrepr')
+                if isinstance(longrepr, dict):
+                    crash = longrepr.get('reprcrash') or {}
+                    result['error'] = crash.get('message')
+                    result['error_traceback'] = _cap_output(json.dumps(longrepr.get('reprtraceback')))
+                elif longrepr:
+                    result['error'] = str(longrepr).splitlines()[-1]
+                    result['error_traceback'] = _cap_output(str(longrepr))
 
     def run_all_tests(self) -> Dict[str, Any]:
         """Run all tests in the project, excluding long-running ones.
@@ -451,7 +610,9 @@ class TestRunner:
         self.test_results = {**unit_results, **self.test_results}
         
         # Combine coverage (weighted average based on test counts)
-        if unit_coverage >= 0 and self.coverage >= 0:
+        if not self.with_coverage:
+            self.coverage = None
+        elif unit_coverage >= 0 and self.coverage >= 0:
             unit_count = len(unit_results)
             integration_count = len(self.test_results) - unit_count
             total_count = unit_count + integration_count
@@ -476,12 +637,7 @@ class TestRunner:
             print("No long tests found.")
             return self.generate_report()
 
-        cmd = [
-            sys.executable, '-m', 'pytest',
-        ] + long_test_files + [
-            '-v', '--tb=short', '--no-header',
-            '--disable-warnings', '--cov=backend', '--cov-report=term'
-        ]
+        cmd = self._pytest_command(*long_test_files)
         
         self._execute_test_run(cmd, parallel=False)
         return self.generate_report()
@@ -489,58 +645,66 @@ class TestRunner:
     def run_unit_tests(self) -> Dict[str, Any]:
         """Run only the unit tests in parallel for faster execution."""
         print("🚀 Running UNIT tests in parallel...")
-        cmd = [
-            sys.executable, '-m', 'pytest',
-            'backend/tests/unit/',
-            '-v', '--tb=short', '--no-header',
-            '--cov=backend', '--cov-report=term'
-        ]
+        cmd = self._pytest_command('backend/tests/unit/')
         self._execute_test_run(cmd, parallel=True)
         return self.generate_report()
     
+    def run_e2e_tests(self) -> Dict[str, Any]:
+        """Run the end-to-end tests in tests/, which start their own servers and browser."""
+        print("🚀 Running E2E tests...")
+        cmd = self._pytest_command('tests/')
+        # loadgroup honours the modules' xdist_group marker, so they share one worker's run.py and build
+        self._execute_test_run(cmd, parallel=True, dist='loadgroup')
+        return self.generate_report()
+    
     def generate_report(self) -> Dict[str, Any]:
         """Generate a JSON report from the test results."""
         
-        # Calculate summary stats
-        self.passed_tests = sum(1 for r in self.test_results.values() if r['status'] == 'passed')
-        self.failed_tests = sum(1 for r in self.test_results.values() if r['status'] == 'failed')
-        self.error_tests = sum(1 for r in self.test_results.values() if r['status'] == 'error')
+        # Calculate summary stats, failure details and runtimes in a single pass
+        passed = failed = errored = 0
+        total_runtime = 0.0
+        failed_tests = []
+        test_runtimes = []
+        for test_name, result in self.test_results.items():
+            status = result['status']
+            runtime = result['runtime']
+            total_runtime += runtime
+            test_runtimes.append({'test_name': test_name, 'runtime': runtime})
+            if status == 'passed':
+                passed += 1
+                continue
+            if status == 'failed':
+                failed += 1
+            elif status == 'error':
+                errored += 1
+            failed_tests.append({
+                'test_name': test_name,
+                'status': status,
+                'error': result.get('error'),
+                'error_type': result.get('error_type'),
+                'runtime': runtime,
+                'traceback': result.get('error_traceback'),
+                'stdout': result.get('stdout'),
+                'stderr': result.get('stderr')
+            })
+        
+        self.passed_tests = passed
+        self.failed_tests = failed
+        self.error_tests = errored
         self.total_tests = len(self.test_results)
         
         if self.total_tests > 0:
             success_rate = (self.passed_tests / self.total_tests) * 100
         else:
             success_rate = 0
-            
-        # Collect failed tests details
-        failed_tests = []
-        for test_name, result in self.test_results.items():
-            if result['status'] != 'passed':
-                failed_tests.append({
-                    'test_name': test_name,
-                    'status': result['status'],
-                    'error': result.get('error'),
-                    'error_type': result.get('error_type'),
-                    'runtime': result['runtime'],
-                    'traceback': result.get('error_traceback'),
-                    'stdout': result.get('stdout', '')[:1000] + '...' if result.get('stdout') and len(result.get('stdout', '')) > 1000 else result.get('stdout'),
-                    'stderr': result.get('stderr', '')[:1000] + '...' if result.get('stderr') and len(result.get('stderr', '')) > 1000 else result.get('stderr')
-                })
-        
-        # Create runtime mapping
-        test_runtimes = [{
-            'test_name': test_name,
-            'runtime': result['runtime']
-        } for test_name, result in self.test_results.items()]
         
         # Sort tests by runtime descending
-        sorted_runtimes = sorted(test_runtimes, key=lambda x: x['runtime'], reverse=True)
+        sorted_runtimes = sorted(test_runtimes, key=itemgetter('runtime'), reverse=True)
         
-        total_runtime = sum(item['runtime'] for item in sorted_runtimes)
         average_runtime = total_runtime / self.total_tests if self.total_tests > 0 else 0
 
         report = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self._run_started.isoformat(),
             'summary': {
                 'total_tests': self.total_tests,
                 'passed_tests': self.passed_tests,
@@ -556,14 +720,35 @@ class TestRunner:
         }
         return report
     
+    def save_last_failed(self):
+        """Record the node IDs of failing tests so they can be replayed with --name last_failed."""
+        node_ids = [
+            result['node_id'] for result in self.test_results.values()
+            if result['status'] != 'passed' and result.get('node_id')
+        ]
+        with open(self.last_failed_path, 'w') as f:
+            json.dump(node_ids, f)
+    
+    def load_last_failed(self) -> List[str]:
+        """Return the node IDs recorded by the previous run's save_last_failed."""
+        try:
+            with open(self.last_failed_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+    
     def save_report(self, report: Dict[str, Any]) -> str:
         """Save the test report to a timestamped JSON file."""
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        timestamp = self._run_started.strftime("%Y-%m-%d_%H-%M-%S")
         filename = f"test_report_{timestamp}.json"
         filepath = self.test_logs_dir / filename
         
-        with open(filepath, 'w') as f:
-            json.dump(report, f, indent=2)
+        try:
+            import orjson
+            filepath.write_bytes(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+        except ImportError:
+            # Compact separators keep the stdlib on its C encoder; indent forces the pure-Python one
+            filepath.write_text(json.dumps(report, separators=(',', ':')))
         
         return str(filepath)
     
@@ -579,7 +764,8 @@ class TestRunner:
         print(f"❌ Failed: {summary['failed_tests']}")
         print(f"💥 Errors: {summary['error_tests']}")
         print(f"Success Rate: {summary['success_rate_percentage']}%")
-        print(f"Coverage: {summary.get('coverage_percentage', 'N/A')}%")
+        coverage = summary.get('coverage_percentage')
+        print(f"Coverage: {'N/A' if coverage is None else f'{coverage}%'}")
         
         total_runtime = sum(t['runtime'] for t in report['test_runtimes'])
         average_runtime = total_runtime / summary['total_tests'] if summary['total_tests'] > 0 else 0
@@ -614,14 +800,16 @@ def parse_args():
     parser.add_argument(
         '--type',
         type=str,
-        choices=['all', 'unit', 'integration', 'single', 'long'],
+        choices=['all', 'unit', 'integration', 'e2e', 'single', 'long', 'interactive'],
         default='all',
-        help="Type of test to run: 'all', 'unit', 'integration', 'long', or 'single'."
+        help="Type of test to run: 'all', 'unit', 'integration', 'e2e', 'long', 'single', or 'interactive'\n"
+             "('interactive' keeps one pytest process alive and runs test names read from stdin)."
     )
     parser.add_argument(
         '--name',
         type=str,
-        help="Name of the test to run when --type is 'single'."
+        nargs='+',
+        help="Name(s) of the test(s) to run when --type is 'single'."
     )
     parser.add_argument(
         '--clean-logs',
@@ -629,6 +817,30 @@ def parse_args():
         help="If set, clears all logs in the test_logs directory before the run."
     )
     parser.add_argument('--exclude-long', action='store_true', help='Exclude long-running tests')
+    parser.add_argument(
+        '--coverage',
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Collect coverage for backend (default: on, except for --type single)."
+    )
+    parser.add_argument(
+        '--failed-first',
+        action='store_true',
+        help="Only rerun the tests that failed in the previous run (pytest --lf).\n"
+             "Use '--type single --name last_failed' to replay the runner's own record instead."
+    )
+    parser.add_argument(
+        '--isolate',
+        action='store_true',
+        help="Run each test in a forked child process (requires pytest-forked) so a crash\n"
+             "only fails that test. Off by default because fork with threads can deadlock on macOS."
+    )
+    parser.add_argument(
+        '--jobs',
+        type=str,
+        default='auto',
+        help="Number of pytest-xdist workers for parallel runs, or 'auto' for one per core."
+    )
     return parser.parse_args()
 
 def get_test_files(test_type, test_name=None, exclude_long=False):
@@ -648,11 +860,17 @@ def main():
         runner = TestRunner(os.path.dirname(os.path.abspath(__file__)))
         runner._clean_test_logs()
 
+    if args.type == 'interactive':
+        TestRunner(os.path.dirname(os.path.abspath(__file__))).run_interactive()
+        sys.exit(0)
+
     if args.type == 'single':
         if not args.name:
             print("Error: --name is required when --type is 'single'")
             sys.exit(1)
-        test_files = [args.name]
+        if args.name == ['last_failed']:
+            args.name = TestRunner(os.path.dirname(os.path.abspath(__file__))).load_last_failed()
+        test_files = args.name
     else:
         test_files = get_test_files(args.type, exclude_long=args.exclude_long)
 
@@ -663,7 +881,14 @@ def main():
     print("🧪 Agent Personal Trainer - Comprehensive Test Runner")
     print("=" * 60)
 
-    runner = TestRunner(os.path.dirname(os.path.abspath(__file__)))
+    with_coverage = args.coverage if args.coverage is not None else args.type != 'single'
+    runner = TestRunner(
+        os.path.dirname(os.path.abspath(__file__)),
+        jobs=args.jobs,
+        with_coverage=with_coverage,
+        failed_first=args.failed_first,
+        isolate=args.isolate
+    )
 
     try:
         # Determine which tests to run
@@ -676,15 +901,19 @@ def main():
         elif args.type == 'integration':
             print("🎯 Running INTEGRATION tests only...")
             report = runner.run_integration_tests(args.exclude_long)
+        elif args.type == 'e2e':
+            print("🎯 Running E2E tests only...")
+            report = runner.run_e2e_tests()
         elif args.type == 'long':
             print("🎯 Running LONG tests only...")
             report = runner.run_long_tests()
         elif args.type == 'single':
-            print(f"🎯 Running SINGLE test: {args.name}")
-            report = runner.run_single_test(args.name)
+            print(f"🎯 Running SINGLE test(s): {' '.join(args.name)}")
+            report = runner.run_tests(args.name)
         
         # Save report
         report_path = runner.save_report(report)
+        runner.save_last_failed()
         
         # Organize old test reports
         runner._organize_test_reports()